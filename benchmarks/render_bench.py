@@ -0,0 +1,272 @@
+# =============================================================================
+# Render-path benchmarks and golden-image checks
+# =============================================================================
+# Times each drawing stage of the poster and the full composition on fixed,
+# generated fixtures (no network, no API keys), then compares the composed
+# posters against the golden images in benchmarks/golden/.
+#
+#   python benchmarks/render_bench.py                  # benchmark + golden check
+#   python benchmarks/render_bench.py --update-golden  # accept current output
+#
+# Exits with status 1 when a poster drifts beyond the perceptual tolerance.
+
+import argparse
+import contextlib
+import io
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+from PIL import Image, ImageChops, ImageDraw, ImageFilter, ImageFont, ImageStat
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from tmdb_omdb_bg import TMDBPosterGenerator  # noqa: E402
+
+GOLDEN_DIR = Path(__file__).resolve().parent / "golden"
+
+# Golden images are stored downscaled; small enough for the repo, large enough to see layout shifts
+GOLDEN_SIZE = (960, 540)
+
+# TMDB backdrop sizes the composition is benchmarked with
+BACKDROP_SIZES = {"w780": (780, 439), "w1280": (1280, 720), "original": (3840, 2160)}
+
+# Pixels whose blurred luminance differs by more than this count as changed
+CHANGED_PIXEL_THRESHOLD = 24
+
+GENRES = {28: "Action", 18: "Drama", 878: "Science Fiction", 10765: "Sci-Fi & Fantasy"}
+
+# =============================================================================
+# FIXTURES
+# =============================================================================
+
+def make_backdrop(size: Tuple[int, int]) -> Image.Image:
+    """Deterministic backdrop with gradients and hard edges to exercise resampling"""
+    width, height = size
+    horizontal = Image.linear_gradient("L").rotate(90).resize(size)
+    vertical = Image.linear_gradient("L").resize(size)
+    backdrop = Image.merge("RGB", (horizontal, vertical, ImageChops.invert(horizontal)))
+    draw = ImageDraw.Draw(backdrop)
+    for i in range(8):
+        x = width * i // 8
+        draw.rectangle((x, height // 3, x + width // 16, height * 2 // 3), fill=(240, 200, 40))
+        draw.ellipse((x, height // 10, x + width // 10, height // 10 + width // 10), outline=(255, 255, 255), width=3)
+    return backdrop
+
+
+def make_logo(size: Tuple[int, int]) -> Image.Image:
+    """Transparent logo with solid and anti-aliased shapes"""
+    width, height = size
+    logo = Image.new("RGBA", size, (0, 0, 0, 0))
+    draw = ImageDraw.Draw(logo)
+    for i in range(5):
+        x = width * i // 5
+        draw.rounded_rectangle((x + 4, 4, x + width // 5 - 4, height - 4), radius=height // 6,
+                               fill=(255, 255, 255, 255), outline=(200, 30, 30, 255), width=4)
+    return logo
+
+
+def make_cases() -> Dict[str, Dict]:
+    """Poster variants covering movie/TV layouts, rating sources and the logo/title fallback"""
+    credits = {
+        "cast": [{"name": "Ada Lovelace"}, {"name": "Grace Hopper"}, {"name": "Alan Turing"}, {"name": "Extra"}],
+        "crew": [{"name": "Katherine Johnson", "job": "Director"}, {"name": "Hedy Lamarr", "job": "Director"}],
+    }
+    overview = ("A deterministic fixture overview that is long enough to wrap across several lines, "
+                "so the text layout, the placeholder ellipsis and the shadow drawing are all exercised "
+                "by the benchmark and by the golden comparison.")
+    return {
+        "movie": {
+            "item": {"id": 1, "title": "Fixture Movie", "release_date": "2024-05-01", "vote_average": 7.9,
+                     "genre_ids": [28, 18, 878], "overview": overview},
+            "details": {"runtime": 131},
+            "credits": credits,
+            "ratings": {"rt_score": 91, "certified_fresh": True, "metacritic_score": 78},
+            "is_movie": True,
+            "logo": (1200, 300),
+        },
+        "tv": {
+            "item": {"id": 2, "name": "Fixture Show", "first_air_date": "2019-09-20", "vote_average": 6.4,
+                     "genre_ids": [18, 10765], "overview": overview},
+            "details": {"number_of_seasons": 3, "created_by": [{"name": "Margaret Hamilton"}]},
+            "credits": credits,
+            "ratings": {"rt_score": None, "certified_fresh": False, "metacritic_score": None},
+            "is_movie": False,
+            "logo": (400, 300),
+        },
+        "title": {
+            "item": {"id": 3, "title": "Fixture Without Logo", "release_date": "1999-03-31", "vote_average": 5.1,
+                     "genre_ids": [878], "overview": overview},
+            "details": {"runtime": 0},
+            "credits": {"cast": credits["cast"], "crew": [{"name": "Producer Person", "job": "Producer"}]},
+            "ratings": {"rt_score": 42, "certified_fresh": False, "metacritic_score": None},
+            "is_movie": True,
+            "logo": None,
+        },
+    }
+
+
+def load_font(path: str, size: int) -> ImageFont.ImageFont:
+    """Font used for rendering; the bundled Pillow font keeps the suite offline"""
+    if path:
+        return ImageFont.truetype(path, size=size)
+    try:
+        return ImageFont.load_default(size=size)
+    except TypeError:
+        # Pillow < 10.1 has no sized default font
+        return ImageFont.load_default()
+
+# =============================================================================
+# BENCHMARKS
+# =============================================================================
+
+def time_stage(fn: Callable[[], object], repeat: int, setup: Callable[[], object] = None) -> List[float]:
+    """Run fn repeat times and return durations in milliseconds; setup runs untimed before each call"""
+    durations = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        started = time.perf_counter()
+        fn()
+        durations.append((time.perf_counter() - started) * 1000)
+    return durations
+
+
+def run_benchmarks(generator: TMDBPosterGenerator, cases: Dict[str, Dict], fonts, repeat: int) -> List[Tuple[str, List[float]]]:
+    """Time every render stage and the full composition"""
+    font_title, font_text = fonts
+    results = []
+    script_dir = Path(__file__).resolve().parent.parent
+    template = Image.open(script_dir / "bckg.png").convert("RGBA")
+    info_pos = (210, 650)
+    movie = cases["movie"]
+
+    canvas = {}
+
+    def fresh_canvas():
+        canvas["img"] = template.copy()
+        canvas["draw"] = ImageDraw.Draw(canvas["img"])
+
+    wide_logo, small_logo = make_logo((1200, 300)), make_logo((400, 300))
+    results.append(("resize_logo (wide)", time_stage(lambda: generator._resize_logo(wide_logo, 1344, 672), repeat)))
+    results.append(("resize_logo (small)", time_stage(lambda: generator._resize_logo(small_logo, 1344, 672), repeat)))
+
+    results.append(("add_credits", time_stage(
+        lambda: generator._add_credits(canvas["draw"], canvas["img"], movie["credits"], info_pos[1] + 80,
+                                       font_text, True, movie["details"]),
+        repeat, fresh_canvas)))
+    results.append(("add_ratings", time_stage(
+        lambda: generator._add_ratings(canvas["draw"], canvas["img"], movie["ratings"], "Action  •  2024  •",
+                                       400, info_pos, font_text, movie["item"]),
+        repeat, fresh_canvas)))
+    results.append(("add_title_or_logo (logo)", time_stage(
+        lambda: generator._add_title_or_logo(canvas["draw"], canvas["img"], movie["item"], wide_logo,
+                                             (200, 420), font_title, info_pos, True),
+        repeat, fresh_canvas)))
+    results.append(("add_title_or_logo (text)", time_stage(
+        lambda: generator._add_title_or_logo(canvas["draw"], canvas["img"], movie["item"], None,
+                                             (200, 420), font_title, info_pos, True),
+        repeat, fresh_canvas)))
+
+    for size_name, size in BACKDROP_SIZES.items():
+        backdrop = make_backdrop(size)
+        logo = make_logo(movie["logo"])
+        poster = {}
+
+        def render():
+            base = generator._compose_base(backdrop)
+            poster["img"] = generator._render_poster(base, logo, movie["item"], movie["details"], movie["credits"],
+                                                     GENRES, movie["ratings"], True, font_title, font_text)
+
+        results.append((f"render_poster ({size_name} backdrop)", time_stage(render, repeat)))
+        results.append((f"jpeg_encode ({size_name} backdrop)", time_stage(
+            lambda: poster["img"].convert("RGB").save(io.BytesIO(), format="JPEG", quality=95,
+                                                      optimize=True, progressive=True, exif=b""),
+            repeat)))
+
+    return results
+
+# =============================================================================
+# GOLDEN IMAGES
+# =============================================================================
+
+def compare_images(actual: Image.Image, golden: Image.Image) -> Tuple[float, float]:
+    """Perceptual distance: RMS of blurred luminance difference and fraction of visibly changed pixels"""
+    def prepare(img):
+        return img.convert("L").resize(GOLDEN_SIZE, Image.Resampling.LANCZOS).filter(ImageFilter.GaussianBlur(1))
+
+    diff = ImageChops.difference(prepare(actual), prepare(golden))
+    rms = ImageStat.Stat(diff).rms[0]
+    histogram = diff.histogram()
+    changed = sum(histogram[CHANGED_PIXEL_THRESHOLD + 1:]) / (GOLDEN_SIZE[0] * GOLDEN_SIZE[1])
+    return rms, changed
+
+
+def check_goldens(generator: TMDBPosterGenerator, cases: Dict[str, Dict], fonts, update: bool,
+                  max_rms: float, max_changed: float) -> Tuple[bool, List[str]]:
+    """Render every case at every backdrop size and compare with (or write) the golden images"""
+    font_title, font_text = fonts
+    GOLDEN_DIR.mkdir(exist_ok=True)
+    all_passed = True
+    report = []
+
+    for case_name, case in cases.items():
+        logo = make_logo(case["logo"]) if case["logo"] else None
+        for size_name, size in BACKDROP_SIZES.items():
+            base = generator._compose_base(make_backdrop(size))
+            poster = generator._render_poster(base, logo, case["item"], case["details"], case["credits"],
+                                              GENRES, case["ratings"], case["is_movie"], font_title, font_text)
+            golden_path = GOLDEN_DIR / f"{case_name}_{size_name}.png"
+
+            if update:
+                poster.convert("RGB").resize(GOLDEN_SIZE, Image.Resampling.LANCZOS).save(golden_path, optimize=True)
+                report.append(f"💾 Updated {golden_path.name}")
+                continue
+
+            if not golden_path.exists():
+                report.append(f"❌ {golden_path.name}: missing, run with --update-golden")
+                all_passed = False
+                continue
+
+            rms, changed = compare_images(poster, Image.open(golden_path))
+            passed = rms <= max_rms and changed <= max_changed
+            all_passed &= passed
+            report.append(f"{'✅' if passed else '❌'} {golden_path.name}: rms {rms:.2f}, changed {changed:.2%}")
+
+    return all_passed, report
+
+# =============================================================================
+# MAIN EXECUTION
+# =============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the poster render path and check it against golden images")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per stage (default 5)")
+    parser.add_argument("--font", default="", help="TrueType font to render with instead of Pillow's default font")
+    parser.add_argument("--update-golden", action="store_true", help="overwrite golden images with the current output")
+    parser.add_argument("--skip-bench", action="store_true", help="only run the golden-image checks")
+    parser.add_argument("--max-rms", type=float, default=2.0, help="allowed RMS luminance difference (0-255)")
+    parser.add_argument("--max-changed", type=float, default=0.005, help="allowed fraction of visibly changed pixels")
+    args = parser.parse_args()
+
+    generator = TMDBPosterGenerator()
+    cases = make_cases()
+    fonts = (load_font(args.font, 190), load_font(args.font, 50))
+
+    # The render path reports progress on stdout; keep the benchmark output readable
+    with contextlib.redirect_stdout(io.StringIO()):
+        results = [] if args.skip_bench else run_benchmarks(generator, cases, fonts, args.repeat)
+        passed, report = check_goldens(generator, cases, fonts, args.update_golden, args.max_rms, args.max_changed)
+
+    for name, durations in results:
+        print(f"⏱️  {name:<34} min {min(durations):8.1f} ms   median {statistics.median(durations):8.1f} ms")
+    print("\n".join(report))
+
+    if not passed:
+        print("❌ Rendered posters differ from the golden images")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
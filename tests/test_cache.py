@@ -0,0 +1,72 @@
+import asyncio
+from datetime import date, timedelta
+
+import tmdb_omdb_bg
+from tmdb_omdb_bg import TMDBPosterGenerator
+
+
+def make_generator(tmp_path, responses):
+    generator = TMDBPosterGenerator()
+    generator.cache_dir = tmp_path
+    last_run = (date.today() - timedelta(days=3)).isoformat()
+    generator.cache_state = {"last_run": last_run, "items": {}}
+    (tmp_path / "movie_550_details.json").write_text("{}")
+
+    async def api_get(endpoint, cache=False):
+        return responses(endpoint)
+
+    generator._api_get = api_get
+    return generator, last_run
+
+
+def test_failed_changes_request_keeps_last_run(tmp_path):
+    generator, last_run = make_generator(
+        tmp_path, lambda endpoint: {} if endpoint.startswith("tv/") else {"results": [], "total_pages": 1})
+
+    assert asyncio.run(generator._invalidate_changed()) == []
+    generator._save_cache_state(date.today(), merge=True)
+
+    assert generator.cache_state["last_run"] == last_run
+    assert (tmp_path / "movie_550_details.json").exists()
+
+
+def test_changed_titles_are_dropped_from_cache(tmp_path):
+    generator, _ = make_generator(
+        tmp_path, lambda endpoint: {"results": [{"id": 550}] if endpoint.startswith("movie/") else [], "total_pages": 1})
+
+    asyncio.run(generator._invalidate_changed())
+    generator._save_cache_state(date.today(), merge=True)
+
+    assert generator.cache_state["last_run"] == date.today().isoformat()
+    assert not (tmp_path / "movie_550_details.json").exists()
+
+
+def test_refreshed_poster_replaces_renamed_title(tmp_path):
+    generator = TMDBPosterGenerator()
+    (tmp_path / "Old_Title_movie-1.jpg").write_bytes(b"old")
+    (tmp_path / "Other_movie-11.jpg").write_bytes(b"other")
+    (tmp_path / "Show_tv-1.jpg").write_bytes(b"show")
+    filename = tmp_path / generator._poster_filename({"id": 1, "title": "New Title"}, True)
+
+    generator._remove_stale_posters(filename)
+
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["Other_movie-11.jpg", "Show_tv-1.jpg"]
+
+
+def test_changes_pages_are_requested_a_few_at_a_time(tmp_path, monkeypatch):
+    monkeypatch.setattr(tmdb_omdb_bg, "CHANGES_CONCURRENCY", 3)
+    generator = TMDBPosterGenerator()
+    in_flight, peak = [0], [0]
+
+    async def api_get(endpoint, cache=False):
+        in_flight[0] += 1
+        peak[0] = max(peak[0], in_flight[0])
+        await asyncio.sleep(0)
+        in_flight[0] -= 1
+        return {"results": [{"id": 1}], "total_pages": 40}
+
+    generator._api_get = api_get
+    ids = asyncio.run(generator._changed_ids("movie", date.today() - timedelta(days=3), date.today()))
+
+    assert ids == {1}
+    assert peak[0] == 3
@@ -0,0 +1,25 @@
+from tmdb_omdb_bg import ExclusionRules
+
+GENRES = {18: "Drama", 16: "Animation"}
+
+
+def test_blank_keywords_are_ignored():
+    rules = ExclusionRules([{"name": "blank", "type": "keyword", "values": ["  ", "", "\t"]}])
+
+    assert rules.match({"title": "Any Title", "genre_ids": [18]}, GENRES) is None
+
+
+def test_keyword_matches_case_and_whitespace_insensitively():
+    rules = ExclusionRules([{"name": "live", "type": "keyword", "values": ["  Live   Show "]}])
+
+    assert rules.match({"name": "The LIVE show Tonight", "genre_ids": []}, GENRES) == "live"
+    assert rules.match({"name": "Showtime", "genre_ids": []}, GENRES) is None
+
+
+def test_inverted_rule_limited_to_genres():
+    rules = ExclusionRules([{"name": "western animation", "type": "country", "invert": True,
+                             "only_genres": ["Animation", " "], "values": ["us"]}])
+
+    assert rules.match({"title": "A", "origin_country": ["jp"], "genre_ids": [16]}, GENRES) == "western animation"
+    assert rules.match({"title": "B", "origin_country": ["us"], "genre_ids": [16]}, GENRES) is None
+    assert rules.match({"title": "C", "origin_country": ["jp"], "genre_ids": [18]}, GENRES) is None
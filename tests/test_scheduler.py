@@ -0,0 +1,105 @@
+import asyncio
+
+import tmdb_omdb_bg
+from tmdb_omdb_bg import TMDBPosterGenerator
+
+
+def make_scheduled(count):
+    return [(1.0, {"id": i, "title": f"Title {i}"}, {}, True) for i in range(count)]
+
+
+def make_item(item_id, title, popularity, vote_count):
+    return {"id": item_id, "title": title, "popularity": popularity, "vote_count": vote_count,
+            "vote_average": 7.0, "overview": "Overview", "genre_ids": []}
+
+
+def test_failed_titles_under_poster_budget_do_not_empty_the_queue_twice(monkeypatch):
+    """Workers woken after the last title was taken by another worker stop instead of popping"""
+    monkeypatch.setattr(tmdb_omdb_bg, "RENDER_WORKERS", 3)
+    generator = TMDBPosterGenerator(max_posters=1)
+    started = []
+
+    async def no_poster(item, genres, is_movie):
+        started.append(item["id"])
+        await asyncio.sleep(0)
+
+    generator._process_item = no_poster
+    asyncio.run(generator._process_queue(make_scheduled(3)))
+
+    assert sorted(started) == [0, 1, 2]
+    assert generator.posters_created == 0
+
+
+def test_poster_budget_stops_remaining_titles(monkeypatch):
+    monkeypatch.setattr(tmdb_omdb_bg, "RENDER_WORKERS", 3)
+    generator = TMDBPosterGenerator(max_posters=2)
+    started = []
+
+    async def one_poster(item, genres, is_movie):
+        started.append(item["id"])
+        await asyncio.sleep(0)
+        generator.posters_created += 1
+
+    generator._process_item = one_poster
+    asyncio.run(generator._process_queue(make_scheduled(5)))
+
+    assert started == [0, 1]
+    assert generator.posters_created == 2
+
+
+def test_discover_backend_ranks_titles_by_popularity_results():
+    generator = TMDBPosterGenerator(backend="discover")
+
+    async def api_get(endpoint, cache=False):
+        if "sort_by=popularity.desc" in endpoint and endpoint.endswith("page=1"):
+            return {"results": [{"id": 7}, {"id": 3}]}
+        return {"results": [{"id": 3}, {"id": 9}]} if endpoint.endswith("page=1") else {"results": []}
+
+    generator._api_get = api_get
+    asyncio.run(generator._discover_sources("movie", {}))
+
+    assert generator.trending_ranks == {(True, 7): 0, (True, 3): 1}
+
+
+def test_cleared_output_does_not_demote_titles_that_had_posters(tmp_path):
+    generator = TMDBPosterGenerator(keep_output=False)
+    generator.output_dir = tmp_path
+    popular = make_item(5, "Popular", 100.0, 1000)
+    niche = make_item(3, "Niche", 40.0, 400)
+    (tmp_path / generator._poster_filename(popular, True)).write_bytes(b"old poster")
+
+    existing = generator._prepare_output_dir(clear=True)
+    scheduled = generator._prioritize([niche, popular], {}, [], {}, existing)
+
+    assert existing == set()
+    assert [item["id"] for _, item, _, _ in scheduled] == [5, 3]
+
+
+def test_kept_output_prefers_missing_posters(tmp_path):
+    generator = TMDBPosterGenerator(keep_output=True)
+    generator.output_dir = tmp_path
+    popular = make_item(5, "Popular", 100.0, 1000)
+    niche = make_item(3, "Niche", 40.0, 400)
+    (tmp_path / generator._poster_filename(popular, True)).write_bytes(b"old poster")
+
+    existing = generator._prepare_output_dir(clear=False)
+    scheduled = generator._prioritize([niche, popular], {}, [], {}, existing)
+
+    assert [item["id"] for _, item, _, _ in scheduled] == [3, 5]
+
+
+def test_deadline_counts_from_startup(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(tmdb_omdb_bg.time, "monotonic", lambda: clock[0])
+    generator = TMDBPosterGenerator(deadline=60)
+    started = []
+
+    async def record(item, genres, is_movie):
+        started.append(item["id"])
+
+    generator._process_item = record
+    # Discovery took longer than the whole deadline
+    clock[0] += 90
+    asyncio.run(generator._process_queue(make_scheduled(3)))
+
+    assert started == []
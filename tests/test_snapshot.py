@@ -0,0 +1,32 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from tmdb_omdb_bg import SnapshotStore, TMDBPosterGenerator
+
+
+def test_concurrent_puts_of_the_same_blob(tmp_path):
+    store = SnapshotStore(tmp_path)
+    data = b"backdrop" * 100_000
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        digests = set(pool.map(lambda _: store.put_blob(data), range(32)))
+
+    assert len(digests) == 1
+    assert store.get_blob(digests.pop()) == data
+    assert not list(tmp_path.rglob("*.tmp"))
+
+
+def test_snapshot_record_keeps_only_poster_fields():
+    details = {"id": 1, "runtime": 131, "overview": "x" * 1000, "created_by": [{"id": 4, "name": "Creator"}],
+               "production_companies": [{"id": 1, "name": "Studio"}]}
+    credits = {
+        "cast": [{"name": f"Actor {i}", "character": "Role", "profile_path": "/p.jpg"} for i in range(50)],
+        "crew": [{"name": "Dir", "job": "Director"}, {"name": "Grip", "job": "Key Grip"},
+                 {"name": "Prod", "job": "Executive Producer"}],
+    }
+
+    assert TMDBPosterGenerator._poster_details(details) == {
+        "runtime": 131, "number_of_seasons": 0, "created_by": [{"name": "Creator"}]}
+    assert TMDBPosterGenerator._poster_credits(credits) == {
+        "cast": [{"name": "Actor 0"}, {"name": "Actor 1"}, {"name": "Actor 2"}],
+        "crew": [{"name": "Dir", "job": "Director"}, {"name": "Prod", "job": "Executive Producer"}],
+    }
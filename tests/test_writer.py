@@ -0,0 +1,63 @@
+import asyncio
+
+import pytest
+from PIL import Image
+
+from tmdb_omdb_bg import PosterWriter, TMDBPosterGenerator
+
+
+class BrokenImage:
+    """Fails while encoding, after the temporary file was created"""
+
+    def convert(self, mode):
+        raise ValueError("encoder failed")
+
+
+async def write_all(jobs):
+    writer = PosterWriter()
+    writer.start()
+    futures = [await writer.submit(image, path) for image, path in jobs]
+    await writer.close()
+    return await asyncio.gather(*futures, return_exceptions=True)
+
+
+def test_write_replaces_existing_poster(tmp_path):
+    target = tmp_path / "Poster_movie-1.jpg"
+    target.write_bytes(b"old poster")
+
+    results = asyncio.run(write_all([(Image.new("RGB", (32, 18), "red"), target)]))
+
+    assert isinstance(results[0], float)
+    assert Image.open(target).size == (32, 18)
+    assert [path.name for path in tmp_path.iterdir()] == [target.name]
+
+
+def test_failed_write_keeps_old_poster_and_reports_error(tmp_path):
+    target = tmp_path / "Poster_movie-1.jpg"
+    target.write_bytes(b"old poster")
+
+    results = asyncio.run(write_all([(BrokenImage(), target)]))
+
+    assert isinstance(results[0], ValueError)
+    assert target.read_bytes() == b"old poster"
+    assert [path.name for path in tmp_path.iterdir()] == [target.name]
+
+
+def test_title_with_failed_writes_is_not_counted(tmp_path):
+    generator = TMDBPosterGenerator()
+    item = {"id": 1, "title": "Broken"}
+
+    async def run():
+        generator.writer = PosterWriter()
+        generator.writer.start()
+        written = await generator.writer.submit(BrokenImage(), tmp_path / "Broken_movie-1.jpg")
+        await generator._title_written(item, True, [written])
+        await generator.writer.close()
+
+    asyncio.run(run())
+
+    assert generator.posters_created == 0
+    assert generator.known_items == {}
+    with pytest.raises(ValueError):
+        PosterWriter._write_atomic(BrokenImage(), tmp_path / "Broken_movie-1.jpg")
+    assert list(tmp_path.iterdir()) == []
@@ -4,14 +4,35 @@
 #Based on the original script by https://github.com/adelatour11/androidtvbackground
 #Modified by https://github.com/nzk0
 
+import argparse
 import asyncio
+import contextlib
+import cProfile
+import json
+import math
+import multiprocessing
+import multiprocessing.util
 import os
+import re
+import pstats
+import queue
 import shutil
+import sys
+import tempfile
 import textwrap
+import threading
+import time
+import tracemalloc
+from collections import Counter, deque
+from datetime import date, datetime, timedelta
 from io import BytesIO
 from pathlib import Path
+from urllib.parse import urlencode
 from typing import Dict, List, Optional, Union, Tuple
 import difflib
+import functools
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
 
 import aiohttp
 from PIL import Image, ImageDraw, ImageFont
@@ -31,6 +52,37 @@ IMAGE_BASE = "https://image.tmdb.org/t/p/original"
 FONT_URL = "https://github.com/googlefonts/roboto/raw/main/src/hinted/Roboto-Light.ttf"
 OUTPUT_DIR = "tmdb_backgrounds"
 
+# Poster languages as TMDB locales, e.g. ["en-US", "fr-FR", "de-DE"] (also set with --locales).
+# The first locale drives discovery; with more than one, each gets its own subfolder and
+# backdrops, credits, ratings and runtime are fetched once and shared between them.
+LOCALES = ["en-US"]
+
+# Keep posters from earlier runs instead of clearing the output folder (also --keep-output)
+KEEP_OUTPUT = False
+
+# Per-title TMDB responses (details, credits, images) are cached here between runs.
+# Entries never expire by age: each run asks TMDB's /changes endpoints what changed since
+# the last successful run and drops only those titles. Safe to delete at any time.
+CACHE_DIR = ".tmdb_cache"
+
+# After this long without a successful run the whole cache is dropped instead
+CACHE_MAX_AGE_DAYS = 90
+
+# TMDB's /changes endpoints accept at most 14 days per query
+CHANGES_WINDOW_DAYS = 14
+
+# /changes pages requested at the same time; a long window has hundreds and TMDB rate-limits bursts
+CHANGES_CONCURRENCY = 4
+
+# fetch/render split: "fetch" stores everything a poster needs here, "render" builds posters from it offline
+SNAPSHOT_DIR = "tmdb_snapshot"
+
+# Processes used by the offline "render" command (None = one per CPU)
+RENDER_PROCESSES = None
+
+# Finished posters waiting for the background writer; rendering pauses when the queue is full
+WRITER_QUEUE_SIZE = 4
+
 # Exclusion filters - customize these to your preferences
 # Examples: ["cn", "kr", "in"] to exclude Chinese, Korean, Indian content
 EXCLUDED_COUNTRIES = []
@@ -41,100 +93,1046 @@ EXCLUDED_GENRES = []
 # Examples: ["adult", "animation"] to exclude adult content and animation
 EXCLUDED_KEYWORDS = []
 
+# Advanced exclusion rules - compiled once at startup, applied to every item.
+# Each rule has a "name" (used in the hit report), a "type" and a list of "values":
+#   "language" - original language code, "country" - origin country code,
+#   "genre" - genre name, "keyword" - text contained in the title (case-insensitive)
+# Optional keys:
+#   "only_genres": apply the rule only to items in one of these genres
+#   "invert": for language/country/genre rules, exclude items NOT in the values
+EXCLUSION_RULES = [
+    # Example: Exclude Hindi, Tamil, Telugu or other specific languages
+    # {"name": "Indian languages", "type": "language",
+    #  "values": ["hi", "ta", "te", "kn", "ml", "bn", "gu", "mr", "pa", "or", "as", "ur"]},
+    
+    # Example: Exclude content with specific keywords in the title
+    # {"name": "Bollywood titles", "type": "keyword",
+    #  "values": ["bollywood", "hindi", "tamil", "telugu", "kannada", "malayalam", "bengali"]},
+    
+    # Example: Filter out talk shows and late night shows
+    # {"name": "Talk shows", "type": "keyword", "values": [
+    #     "tonight show", "late show", "late night", "daily show", "talk show",
+    #     "with stephen", "with jimmy", "with trevor", "with john", "with bill",
+    #     "real time", "last week tonight", "saturday night live", "snl",
+    #     "the view", "the talk", "good morning", "morning show", "today show",
+    #     "meet the press", "face the nation", "this week", "state of the union",
+    #     "tucker carlson", "sean hannity", "rachel maddow", "anderson cooper",
+    #     "bill maher", "conan", "ellen", "oprah", "dr. phil", "jerry springer"
+    # ]},
+    
+    # Example: Allow Western animation but exclude Asian animation (anime) and unknown origins
+    # {"name": "Non-western animation", "type": "country", "only_genres": ["Animation"], "invert": True,
+    #  "values": ["us", "ca", "gb", "au", "nz", "ie", "fr", "de", "es", "it", "nl", "be", "dk", "se", "no", "fi"]},
+]
+
+# =============================================================================
+# DISCOVERY - where candidate titles come from
+# =============================================================================
+# "lists": the fixed trending, popular, now playing/on the air and top rated lists
+# "discover": TMDB /discover queries with the exclusion rules applied server-side,
+#             so fewer fetched items are thrown away (also set with --backend)
+DISCOVERY_BACKEND = "lists"
+
+# Sort orders queried by the discover backend, each fetched for DISCOVER_PAGES pages
+DISCOVER_SORTS = ["popularity.desc", "vote_count.desc"]
+DISCOVER_PAGES = 3
+
+# Vote thresholds applied by the discover backend
+DISCOVER_MIN_VOTE_COUNT = 50
+DISCOVER_MIN_VOTE_AVERAGE = 0.1
+
+# =============================================================================
+# SCHEDULING - which titles are rendered first, and when to stop
+# =============================================================================
+# Titles are processed highest score first. Each feature is scaled to 0-1:
+#   trending   - position in the daily/weekly trending lists
+#   popularity - TMDB popularity, log-scaled against the most popular candidate
+#   vote_count - number of votes, log-scaled against the most voted candidate
+#   freshness  - release date recency, halving every FRESHNESS_HALF_LIFE_DAYS
+#   missing    - 1 when the poster is not already in the output folder
+PRIORITY_WEIGHTS = {"trending": 3.0, "popularity": 2.0, "vote_count": 1.0, "freshness": 1.0, "missing": 2.0}
+FRESHNESS_HALF_LIFE_DAYS = 180
+
+# Titles processed at the same time
+RENDER_WORKERS = 2
+
+# Budgets: stop starting new titles after this many posters or seconds since startup (None = no limit).
+# Also set with --max-posters and --deadline.
+MAX_POSTERS = None
+DEADLINE_SECONDS = None
+
+# =============================================================================
+# RUN PLANNING - used by --plan to estimate a run before doing it
+# =============================================================================
+# Stage timings and download sizes are recorded here after every run
+STATS_FILE = "tmdb_stats.json"
+
+# OMDB free tier allows 1,000 requests per day
+OMDB_DAILY_LIMIT = 1000
+
+# Fallback estimates used until a real run has recorded its own timings
+DEFAULT_STAGE_SECONDS = {"tmdb": 0.25, "omdb": 0.4, "backdrop": 0.8, "logo": 0.2, "render": 2.5}
+DEFAULT_STAGE_BYTES = {"backdrop": 1_500_000, "logo": 60_000}
+
+# =============================================================================
+# PROFILING - used by --profile
+# =============================================================================
+PROFILE_DIR = "profiles"
+PROFILE_SAMPLE_INTERVAL = 0.005  # Seconds between stack samples for the flamegraph
+PROFILE_TRACEBACK_DEPTH = 10     # Frames kept per allocation by tracemalloc
+PROFILE_TOP_ENTRIES = 25         # Functions and allocations listed in the summary
+
+# =============================================================================
+# EXCLUSION RULES
+# =============================================================================
+
+class ExclusionRules:
+    """Exclusion filters compiled once into lookup sets and a combined title matcher"""
+    
+    SET_TYPES = ("country", "language", "genre")
+    RULE_TYPES = SET_TYPES + ("keyword",)
+
+    def __init__(self, rules: List[Dict]):
+        self.hits = Counter()
+        # Plain set rules are merged into one value -> rule name map per type
+        self.lookups = {rule_type: {} for rule_type in self.SET_TYPES}
+        # Inverted or genre-restricted set rules: (name, type, values, invert, only_genres)
+        self.scoped_rules = []
+        # Keyword rules grouped by genre restriction: only_genres -> (pattern, keyword -> rule name)
+        keyword_groups = {}
+        
+        for rule in rules:
+            name = rule.get("name") or f"{rule.get('type')} rule"
+            rule_type = rule.get("type")
+            if rule_type not in self.RULE_TYPES:
+                raise ValueError(f"Unknown exclusion rule type {rule_type!r} in rule {name!r}")
+            # Drop blanks after normalizing: an empty keyword would match every title
+            values = [v for v in map(self.normalize, rule.get("values", [])) if v]
+            only_genres = frozenset(g for g in map(self.normalize, rule.get("only_genres", [])) if g) or None
+            
+            if rule_type == "keyword":
+                owners = keyword_groups.setdefault(only_genres, {})
+                for keyword in values:
+                    owners.setdefault(keyword, name)
+            elif rule.get("invert") or only_genres:
+                self.scoped_rules.append((name, rule_type, frozenset(values), bool(rule.get("invert")), only_genres))
+            else:
+                for value in values:
+                    self.lookups[rule_type].setdefault(value, name)
+        
+        # Longest keywords first so overlapping keywords report the most specific rule
+        self.keyword_matchers = [
+            (only_genres, re.compile("|".join(re.escape(k) for k in sorted(owners, key=len, reverse=True))), owners)
+            for only_genres, owners in keyword_groups.items() if owners
+        ]
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """Case-fold and collapse whitespace so titles and keywords compare consistently"""
+        return " ".join(str(text).casefold().split())
+
+    def match(self, item: Dict, genres: Dict[int, str]) -> Optional[str]:
+        """Return the name of the first rule excluding this item, or None"""
+        origin = item.get("origin_country", "")
+        values = {
+            "country": (origin[0] if isinstance(origin, list) and origin else origin or "").lower(),
+            "language": (item.get("original_language") or "").lower(),
+        }
+        item_genres = {self.normalize(genres.get(gid, "")) for gid in item.get("genre_ids", [])}
+        
+        rule_name = self._match_sets(values, item_genres)
+        if rule_name is None:
+            title = self.normalize(item.get("title") or item.get("name", ""))
+            for only_genres, pattern, owners in self.keyword_matchers:
+                if only_genres and not only_genres & item_genres:
+                    continue
+                found = pattern.search(title)
+                if found:
+                    rule_name = owners[found.group(0)]
+                    break
+        
+        if rule_name is not None:
+            self.hits[rule_name] += 1
+        return rule_name
+
+    def _match_sets(self, values: Dict[str, str], item_genres: set) -> Optional[str]:
+        """Check country, language and genre lookups, then the scoped rules"""
+        for rule_type in ("country", "language"):
+            if values[rule_type] in self.lookups[rule_type]:
+                return self.lookups[rule_type][values[rule_type]]
+        for genre in item_genres:
+            if genre in self.lookups["genre"]:
+                return self.lookups["genre"][genre]
+        
+        for name, rule_type, rule_values, invert, only_genres in self.scoped_rules:
+            if only_genres and not only_genres & item_genres:
+                continue
+            if rule_type == "genre":
+                matched = bool(rule_values & item_genres)
+            else:
+                matched = values[rule_type] in rule_values
+            if matched != invert:
+                return name
+        return None
+
+    def server_filters(self) -> Dict[str, Optional[set]]:
+        """Filters TMDB /discover can apply itself: excluded genres and language/country/genre allow-lists.
+        
+        Excluded languages and countries have no server-side equivalent and stay client-side only.
+        Genre-restricted rules are never pushed down.
+        """
+        filters = {"without_genres": set(self.lookups["genre"]), "genre": None, "language": None, "country": None}
+        for _, rule_type, rule_values, invert, only_genres in self.scoped_rules:
+            if not invert or only_genres:
+                continue
+            # Several allow-lists of the same type must all pass, so intersect them
+            current = filters[rule_type]
+            filters[rule_type] = set(rule_values) if current is None else current & rule_values
+        return filters
+
+    def report(self):
+        """Print how many items each rule excluded"""
+        for name, count in self.hits.most_common():
+            print(f"🚫 Excluded by '{name}': {count}")
+
+
+def _build_exclusion_rules() -> List[Dict]:
+    """Combine the simple exclusion lists with EXCLUSION_RULES"""
+    rules = []
+    if EXCLUDED_COUNTRIES:
+        rules.append({"name": "Excluded countries", "type": "country", "values": EXCLUDED_COUNTRIES})
+    if EXCLUDED_GENRES:
+        rules.append({"name": "Excluded genres", "type": "genre", "values": EXCLUDED_GENRES})
+    if EXCLUDED_KEYWORDS:
+        rules.append({"name": "Excluded keywords", "type": "keyword", "values": EXCLUDED_KEYWORDS})
+    return rules + EXCLUSION_RULES
+
+# =============================================================================
+# OUTPUT WRITER
+# =============================================================================
+
+class PosterWriter:
+    """Encodes and writes posters on a background thread so slow disks never stall the event loop.
+    
+    Each poster is written to a temporary file in the output folder, fsynced and atomically
+    renamed, so readers never see a half-written JPEG.
+    """
+
+    def __init__(self, queue_size: int = WRITER_QUEUE_SIZE):
+        self._jobs = queue.Queue()
+        self._slots = asyncio.Semaphore(queue_size)
+        self._thread = threading.Thread(target=self._work, name="poster-writer", daemon=True)
+
+    def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._thread.start()
+
+    async def submit(self, image: Image.Image, path: Path) -> asyncio.Future:
+        """Queue a poster for writing, waiting while the queue is full; the future resolves to seconds spent"""
+        await self._slots.acquire()
+        future = self._loop.create_future()
+        self._jobs.put((image, path, future))
+        return future
+
+    async def close(self):
+        """Finish all queued writes and stop the thread"""
+        self._jobs.put(None)
+        await self._loop.run_in_executor(None, self._thread.join)
+
+    def _work(self):
+        # Under --profile, encoding time on this thread belongs in the run's profile too
+        profiler = RunProfiler.active
+        with profiler.profile_thread() if profiler is not None else contextlib.nullcontext():
+            self._run_jobs()
+
+    def _run_jobs(self):
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+            image, path, future = job
+            started = time.perf_counter()
+            try:
+                self._write_atomic(image, path)
+                result, error = time.perf_counter() - started, None
+            except Exception as e:
+                result, error = None, e
+            self._loop.call_soon_threadsafe(self._finish, future, result, error)
+
+    def _finish(self, future: asyncio.Future, result: Optional[float], error: Optional[Exception]):
+        self._slots.release()
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    @staticmethod
+    def _write_atomic(image: Image.Image, path: Path):
+        """Encode to a temporary file next to the target, fsync it, then rename over the target"""
+        fd, temp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.stem}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                # Save with optimizations for Reddit/ProjectiVy
+                image.convert('RGB').save(
+                    f,
+                    format='JPEG',
+                    quality=95,
+                    optimize=True,
+                    progressive=True,
+                    exif=b''  # Strip all metadata
+                )
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_name, path)
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.unlink(temp_name)
+            raise
+        
+        # Persist the rename itself; not supported on Windows
+        if hasattr(os, "O_DIRECTORY"):
+            dir_fd = os.open(path.parent, os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                os.fsync(dir_fd)
+            finally:
+                os.close(dir_fd)
+
+# =============================================================================
+# SNAPSHOTS
+# =============================================================================
+
+class SnapshotStore:
+    """Fetched titles as JSON lines plus a content-addressed store of the downloaded images.
+    
+    Layout: manifest.json, items.jsonl (one title per line, images referenced by SHA-256)
+    and blobs/<first two hex digits>/<sha256>. Identical images are stored once.
+    """
+
+    def __init__(self, root: Path):
+        self.root = root
+        self.blob_dir = root / "blobs"
+        self.items_path = root / "items.jsonl"
+        self.manifest_path = root / "manifest.json"
+        self._items = None
+
+    def open_for_write(self):
+        """Start a new item list; blobs from earlier fetches are kept and reused"""
+        self.blob_dir.mkdir(parents=True, exist_ok=True)
+        # An interrupted fetch leaves no manifest, so render never uses a partial item list
+        self.manifest_path.unlink(missing_ok=True)
+        self._items = open(self.items_path, "w", encoding="utf-8")
+
+    async def add(self, record: Dict, backdrop_data: bytes, logo_data: Dict[str, Optional[bytes]]):
+        """Store a title's images off the event loop and append its record"""
+        loop = asyncio.get_running_loop()
+        record = dict(record)
+        record["backdrop"] = await loop.run_in_executor(None, self.put_blob, backdrop_data)
+        record["logos"] = {}
+        for logo_path, data in logo_data.items():
+            record["logos"][logo_path] = await loop.run_in_executor(None, self.put_blob, data) if data else None
+        self._items.write(json.dumps(record) + "\n")
+
+    def close(self, manifest: Dict):
+        """Finish the item list and write the manifest last, marking the snapshot complete"""
+        self._items.close()
+        self.manifest_path.write_text(json.dumps(manifest, indent=2))
+
+    def read_manifest(self) -> Dict:
+        return json.loads(self.manifest_path.read_text())
+
+    def put_blob(self, data: bytes) -> str:
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._blob_path(digest)
+        if path.exists():
+            return digest
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Titles sharing an image may store it concurrently; each writes its own temporary file
+        fd, temp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{digest}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(temp_name, path)
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.unlink(temp_name)
+            # Same content under the same name; another writer finishing first is success
+            if not path.exists():
+                raise
+        return digest
+
+    def get_blob(self, digest: str) -> bytes:
+        return self._blob_path(digest).read_bytes()
+
+    def _blob_path(self, digest: str) -> Path:
+        return self.blob_dir / digest[:2] / digest
+
+
+# Per-process state of the offline render workers, set up once by _init_render_worker
+_render_worker = {}
+
+
+def _init_render_worker(snapshot_dir: str, locales: List[str], output_dir: str, profile: bool):
+    """Build the generator, fonts and optional profiler a render worker process reuses for every title"""
+    store = SnapshotStore(Path(snapshot_dir))
+    generator = TMDBPosterGenerator(locales=locales)
+    generator.output_dir = Path(output_dir)
+    font_digest = store.read_manifest().get("font")
+    generator.font_data = store.get_blob(font_digest) if font_digest else b""
+    _render_worker.update(
+        store=store,
+        generator=generator,
+        fonts=(generator._load_font(190), generator._load_font(50)),
+    )
+    if profile:
+        # One profile per worker covering all its titles, written when the pool shuts the worker down
+        profiler = RunProfiler(Path(PROFILE_DIR), label="render-worker").__enter__()
+        multiprocessing.util.Finalize(profiler, profiler.__exit__, args=(None, None, None), exitpriority=10)
+
+
+def _render_snapshot_record(line: str) -> List[str]:
+    """Render and write all locale posters of one snapshot record; runs in a worker process"""
+    store, generator = _render_worker["store"], _render_worker["generator"]
+    record = json.loads(line)
+    backdrop_data = store.get_blob(record["backdrop"])
+    logo_data = {path: store.get_blob(digest) if digest else None for path, digest in record["logos"].items()}
+    
+    written = []
+    for filename, poster in generator._render_record(record, backdrop_data, logo_data, *_render_worker["fonts"]):
+        generator._remove_stale_posters(filename)
+        PosterWriter._write_atomic(poster, filename)
+        written.append(filename.name)
+    return written
+
+# =============================================================================
+# PROFILING
+# =============================================================================
+
+class RunProfiler:
+    """cProfile, tracemalloc and a stack sampler wrapped around one process's share of a run.
+    
+    Writes <label>-<pid>.pstats, a <label>-<pid>.collapsed stack file for flamegraph tools
+    and a <label>-<pid>-summary.txt with the CPU/wait split and top allocations. cProfile
+    only covers threads that opt in through profile_thread(); the sampler sees every thread.
+    """
+
+    # Profiler of the current run, for worker threads that want to be included
+    active = None
+
+    def __init__(self, output_dir: Path, label: str = "main"):
+        self.output_dir = output_dir
+        self.label = label
+        self.samples = Counter()
+        self.thread_samples = Counter()
+        self.target_samples = 0
+        self.wait_samples = 0
+        self.thread_profiles = []
+        self.thread_cpu = Counter()
+        self._stop = threading.Event()
+
+    @contextlib.contextmanager
+    def profile_thread(self):
+        """cProfile the calling thread; its stats are merged into the run's pstats and its CPU time reported"""
+        profile = cProfile.Profile()
+        cpu_started = time.thread_time()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            self.thread_cpu[threading.current_thread().name] += time.thread_time() - cpu_started
+            self.thread_profiles.append(profile)
+
+    def __enter__(self):
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        RunProfiler.active = self
+        self._target = threading.get_ident()
+        self._sampler = threading.Thread(target=self._sample, name="profile-sampler", daemon=True)
+        tracemalloc.start(PROFILE_TRACEBACK_DEPTH)
+        self.profile = cProfile.Profile()
+        self._wall_started = time.perf_counter()
+        # CPU of the profiled thread only; worker threads and the sampler are reported separately
+        self._cpu_started = time.thread_time()
+        self._process_cpu_started = time.process_time()
+        self._sampler.start()
+        self.profile.enable()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.profile.disable()
+        RunProfiler.active = None
+        wall = time.perf_counter() - self._wall_started
+        cpu = time.thread_time() - self._cpu_started
+        process_cpu = time.process_time() - self._process_cpu_started
+        self._stop.set()
+        self._sampler.join()
+        peak = tracemalloc.get_traced_memory()[1]
+        snapshot = tracemalloc.take_snapshot().filter_traces([tracemalloc.Filter(False, tracemalloc.__file__)])
+        tracemalloc.stop()
+        # Leave out the sampler's own bookkeeping; checked per grouped traceback, since one
+        # all_frames filter per sampler line takes tens of seconds on a long run's traces
+        sampler_lines = {line for _, _, line in RunProfiler._sample.__code__.co_lines() if line}
+        allocations = [
+            stat for stat in snapshot.statistics("traceback")
+            if not any(frame.filename == __file__ and frame.lineno in sampler_lines for frame in stat.traceback)
+        ]
+        self._write_reports(wall, cpu, process_cpu, peak, allocations)
+        return False
+
+    def _sample(self):
+        """Record every thread's stack at a fixed interval, rooted at the thread name"""
+        sampler = threading.get_ident()
+        cpu_started = time.thread_time()
+        while not self._stop.wait(PROFILE_SAMPLE_INTERVAL):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == sampler:
+                    continue
+                if ident == self._target:
+                    self.target_samples += 1
+                    # An idle event loop sits in selectors.select waiting on sockets
+                    if frame.f_code.co_filename.endswith("selectors.py"):
+                        self.wait_samples += 1
+                name = names.get(ident, f"thread-{ident}")
+                self.thread_samples[name] += 1
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                self.samples[";".join([name] + stack[::-1])] += 1
+        self.thread_cpu["profile-sampler"] += time.thread_time() - cpu_started
+
+    def _write_reports(self, wall: float, cpu: float, process_cpu: float, peak: int,
+                       allocations: List[tracemalloc.Statistic]):
+        """Write pstats, collapsed stacks and the summary report"""
+        prefix = self.output_dir / f"{self.label}-{os.getpid()}"
+        # Calls are summed over the profiled threads; the main thread's time includes waiting on the others
+        stats = pstats.Stats(self.profile, *self.thread_profiles)
+        stats.dump_stats(f"{prefix}.pstats")
+        
+        with open(f"{prefix}.collapsed", "w") as f:
+            for stack, count in self.samples.most_common():
+                f.write(f"{stack} {count}\n")
+        
+        total_samples = self.target_samples
+        wait = wall * self.wait_samples / total_samples if total_samples else 0.0
+        
+        with open(f"{prefix}-summary.txt", "w") as f:
+            f.write(f"Wall time:            {wall:8.2f}s\n")
+            f.write(f"CPU time:             {cpu:8.2f}s\n")
+            f.write(f"Event loop waiting:   {wait:8.2f}s ({self.wait_samples}/{total_samples} samples)\n")
+            f.write(f"Other (GIL, threads): {max(wall - cpu - wait, 0.0):8.2f}s\n")
+            f.write("(CPU, waiting and other cover the profiled thread only)\n\n")
+            
+            f.write("CPU time per thread\n")
+            f.write(f"    {'profiled thread':<24} {cpu:8.2f}s\n")
+            for name, seconds in self.thread_cpu.most_common():
+                f.write(f"    {name:<24} {seconds:8.2f}s\n")
+            f.write(f"    {'whole process':<24} {process_cpu:8.2f}s\n\n")
+            
+            f.write("Stack samples per thread\n")
+            for name, count in self.thread_samples.most_common():
+                f.write(f"    {name:<24} {count:6d}\n")
+            f.write("\n")
+            
+            f.write(f"Top {PROFILE_TOP_ENTRIES} functions by cumulative time (main thread and profiled workers)\n")
+            stats.stream = f
+            stats.sort_stats("cumulative").print_stats(PROFILE_TOP_ENTRIES)
+            
+            f.write(f"Peak traced memory: {peak / 1_048_576:.1f} MiB\n")
+            f.write(f"Top {PROFILE_TOP_ENTRIES} allocations still held at exit\n")
+            for stat in allocations[:PROFILE_TOP_ENTRIES]:
+                f.write(f"{stat.size / 1024:10.1f} KiB in {stat.count} blocks\n")
+                for line in stat.traceback.format():
+                    f.write(f"    {line}\n")
+        
+        print(f"📈 Profile written to {prefix}.* (wall {wall:.1f}s, CPU {cpu:.1f}s, waiting {wait:.1f}s)")
+
 # =============================================================================
 # MAIN CLASS
 # =============================================================================
 
 class TMDBPosterGenerator:
-    def __init__(self):
-        # Validate API keys
-        if API_KEY == "YOUR_TMDB_API_KEY_HERE" or not API_KEY:
-            raise ValueError("Please set your TMDB API key in the API_KEY variable")
-        if OMDB_API_KEY == "YOUR_OMDB_API_KEY_HERE" or not OMDB_API_KEY:
-            raise ValueError("Please set your OMDB API key in the OMDB_API_KEY variable")
-            
+    def __init__(self, backend: str = DISCOVERY_BACKEND, locales: Optional[List[str]] = None,
+                 max_posters: Optional[int] = MAX_POSTERS, deadline: Optional[float] = DEADLINE_SECONDS,
+                 keep_output: bool = KEEP_OUTPUT):
         self.headers = {"accept": "application/json", "Authorization": f"Bearer {API_KEY}"}
         self.font_cache = {}
         self.output_dir = Path(OUTPUT_DIR)
-        
-        # Clean and create output directory
-        if self.output_dir.exists():
-            shutil.rmtree(self.output_dir)
-        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.stats = {}
+        self.exclusion_rules = ExclusionRules(_build_exclusion_rules())
+        if backend not in ("lists", "discover"):
+            raise ValueError(f"Unknown discovery backend {backend!r}, expected 'lists' or 'discover'")
+        self.backend = backend
+        self.locales = list(locales or LOCALES)
+        # Discovery, OMDB matching and the required logo use the first locale
+        self.language = self.locales[0]
+        self.locale_genres = {}
+        self._templates = None
+        self.max_posters = max_posters
+        self.deadline = deadline
+        # Counted from startup, so an HH:MM deadline also covers change checks and discovery
+        self._deadline_at = time.monotonic() + deadline if deadline is not None else None
+        self.keep_output = keep_output
+        self.trending_ranks = {}
+        self.posters_created = 0
+        self._title_writes = set()
+        self._budget_changed = None
+        self.font_data = None
+        self.snapshot = None
+        self.cache_dir = Path(CACHE_DIR)
+        self.cache_state = self._load_cache_state()
+        self.changes_checked = True
+        self.known_items = {}
 
     async def run(self):
         """Main entry point"""
+        self._check_api_keys()
         print("🎬 Starting TMDB poster generation...")
+        run_date = date.today()
+        existing = self._prepare_output_dir(clear=not self.keep_output)
+        
+        self.writer = PosterWriter()
+        self.writer.start()
+        try:
+            async with aiohttp.ClientSession(headers=self.headers, timeout=aiohttp.ClientTimeout(30)) as session:
+                self.session = session
+                await self._invalidate_changed()
+                movie_genres, tv_genres, unique_movies, unique_tv = await self._discover()
+                await self._load_locale_genres(movie_genres, tv_genres)
+                
+                # Process movies and TV shows, most valuable first
+                scheduled = self._prioritize(unique_movies, movie_genres, unique_tv, tv_genres, existing)
+                await self._process_queue(scheduled)
+        finally:
+            await self.writer.close()
+        
+        self.exclusion_rules.report()
+        self._save_stats()
+        self._save_cache_state(run_date, merge=self.keep_output)
+        print(f"✅ Poster generation completed! ({self.posters_created} titles)")
+
+    async def refresh(self):
+        """Re-render only titles TMDB reports as changed since the last run, keeping all other posters"""
+        self._check_api_keys()
+        print("🔄 Refreshing changed TMDB posters...")
+        if not self.cache_state.get("last_run"):
+            print("⚠️  No previous run recorded, run without --refresh first")
+            return
+        run_date = date.today()
+        self._prepare_output_dir(clear=False)
+        
+        self.writer = PosterWriter()
+        self.writer.start()
+        try:
+            async with aiohttp.ClientSession(headers=self.headers, timeout=aiohttp.ClientTimeout(30)) as session:
+                self.session = session
+                changed = await self._invalidate_changed()
+                if changed:
+                    genre_results = await asyncio.gather(
+                        self._api_get(f"genre/movie/list?language={self.language}"),
+                        self._api_get(f"genre/tv/list?language={self.language}")
+                    )
+                    movie_genres = {g["id"]: g["name"] for g in genre_results[0].get("genres", [])}
+                    tv_genres = {g["id"]: g["name"] for g in genre_results[1].get("genres", [])}
+                    await self._load_locale_genres(movie_genres, tv_genres)
+                    
+                    items = await asyncio.gather(*[self._refreshed_item(key) for key in changed])
+                    movies = [item for item, is_movie in items if item and is_movie]
+                    tv_shows = [item for item, is_movie in items if item and not is_movie]
+                    scheduled = self._prioritize(movies, movie_genres, tv_shows, tv_genres, set())
+                    await self._process_queue(scheduled)
+        finally:
+            await self.writer.close()
+        
+        self._save_stats()
+        self._save_cache_state(run_date, merge=True)
+        print(f"✅ Refresh completed! ({self.posters_created} titles re-rendered)")
+
+    async def fetch(self, snapshot_dir: Path):
+        """Discover titles and record everything their posters need in a snapshot, without rendering"""
+        self._check_api_keys()
+        print(f"📥 Fetching TMDB titles into snapshot {snapshot_dir}/...")
+        run_date = date.today()
+        self.snapshot = SnapshotStore(snapshot_dir)
+        self.snapshot.open_for_write()
         
         async with aiohttp.ClientSession(headers=self.headers, timeout=aiohttp.ClientTimeout(30)) as session:
             self.session = session
+            await self._invalidate_changed()
+            movie_genres, tv_genres, unique_movies, unique_tv = await self._discover()
+            await self._load_locale_genres(movie_genres, tv_genres)
+            await self._get_font(50)
             
-            # Fetch genres and multiple trending/popular endpoints concurrently
-            results = await asyncio.gather(
-                # Genre lists
-                self._api_get("genre/movie/list?language=en-US"),
-                self._api_get("genre/tv/list?language=en-US"),
-                
-                # Movie endpoints - more variety and current content
-                self._api_get("trending/movie/day?language=en-US"),      # Daily trending (most current)
-                self._api_get("trending/movie/week?language=en-US"),     # Weekly trending (original)
-                self._api_get("movie/popular?language=en-US"),           # Popular movies
-                self._api_get("movie/now_playing?language=en-US"),       # Current cinema releases
-                self._api_get("movie/top_rated?language=en-US"),         # Highly rated movies
-                
-                # TV endpoints - more variety and current content
-                self._api_get("trending/tv/day?language=en-US"),         # Daily trending TV
-                self._api_get("trending/tv/week?language=en-US"),        # Weekly trending TV (original)
-                self._api_get("tv/popular?language=en-US"),              # Popular TV shows
-                self._api_get("tv/on_the_air?language=en-US"),           # Currently airing
-                self._api_get("tv/top_rated?language=en-US")             # Highly rated TV
-            )
-            
-            movie_genres = {g["id"]: g["name"] for g in results[0].get("genres", [])}
-            tv_genres = {g["id"]: g["name"] for g in results[1].get("genres", [])}
-            
-            # Combine all movie sources
-            all_movies = []
-            movie_sources = [
-                ("Daily Trending Movies", results[2].get("results", [])),
-                ("Weekly Trending Movies", results[3].get("results", [])),
-                ("Popular Movies", results[4].get("results", [])),
-                ("Now Playing Movies", results[5].get("results", [])),
-                ("Top Rated Movies", results[6].get("results", []))
-            ]
-            
-            for source_name, movies in movie_sources:
-                print(f"📊 {source_name}: {len(movies)} items")
-                all_movies.extend(movies)
-            
-            # Combine all TV sources
-            all_tv = []
-            tv_sources = [
-                ("Daily Trending TV", results[7].get("results", [])),
-                ("Weekly Trending TV", results[8].get("results", [])),
-                ("Popular TV", results[9].get("results", [])),
-                ("On The Air TV", results[10].get("results", [])),
-                ("Top Rated TV", results[11].get("results", []))
+            scheduled = self._prioritize(unique_movies, movie_genres, unique_tv, tv_genres, set())
+            await self._process_queue(scheduled)
+        
+        self.snapshot.close({
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "locales": self.locales,
+            "titles": self.posters_created,
+            "font": self.snapshot.put_blob(self.font_data) if self.font_data else None,
+        })
+        self.exclusion_rules.report()
+        self._save_stats()
+        # The snapshot's titles are the ones its render produces, so --refresh can find them
+        self._save_cache_state(run_date, merge=self.keep_output)
+        print(f"✅ Snapshot completed! ({self.posters_created} titles)")
+
+    async def render(self, snapshot_dir: Path, workers: Optional[int] = RENDER_PROCESSES, profile: bool = False):
+        """Build every poster in a snapshot offline, spread over worker processes"""
+        store = SnapshotStore(snapshot_dir)
+        if not store.manifest_path.exists():
+            print(f"❌ No complete snapshot in {snapshot_dir}/, run the fetch command first")
+            return
+        manifest = store.read_manifest()
+        self.locales = manifest["locales"]
+        self.language = self.locales[0]
+        print(f"🖌️  Rendering {manifest['titles']} titles from snapshot {snapshot_dir}/ ({manifest['created']})...")
+        self._prepare_output_dir(clear=not self.keep_output)
+        
+        loop = asyncio.get_running_loop()
+        # Spawned workers start clean instead of inheriting the event loop, threads and profiler state
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                                 initializer=_init_render_worker,
+                                 initargs=(str(snapshot_dir), self.locales, str(self.output_dir), profile)) as pool:
+            with open(store.items_path, encoding="utf-8") as items:
+                tasks = [loop.run_in_executor(pool, _render_snapshot_record, line) for line in items if line.strip()]
+            for task in asyncio.as_completed(tasks):
+                try:
+                    for name in await task:
+                        print(f"✅ Created: {name}")
+                    self.posters_created += 1
+                except Exception as e:
+                    print(f"❌ Rendering failed: {e}")
+        
+        print(f"✅ Rendering completed! ({self.posters_created} titles)")
+
+    def _prepare_output_dir(self, clear: bool) -> set:
+        """Create the output folders, optionally clearing old posters; returns the poster names that remain"""
+        if self.output_dir.exists() and clear:
+            shutil.rmtree(self.output_dir)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        for locale in self.locales:
+            self._locale_output_dir(locale).mkdir(parents=True, exist_ok=True)
+        # After clearing every title is missing, so the budget still goes to the most valuable ones
+        return {path.name for path in self._locale_output_dir(self.language).glob("*.jpg")}
+
+    async def _refreshed_item(self, key: str) -> Tuple[Optional[Dict], bool]:
+        """Stored list item of a changed title, updated from its freshly fetched details"""
+        entry = self.cache_state["items"][key]
+        item, is_movie = dict(entry["item"]), entry["is_movie"]
+        media_type = "movie" if is_movie else "tv"
+        details = await self._api_get(self._details_endpoint(media_type, item["id"], self.language), cache=True)
+        if not details.get("id"):
+            return None, is_movie
+        
+        name_key, date_key = ("title", "release_date") if is_movie else ("name", "first_air_date")
+        for field in (name_key, date_key, "overview", "backdrop_path", "vote_average", "vote_count", "popularity"):
+            if field in details:
+                item[field] = details[field]
+        item["genre_ids"] = [genre["id"] for genre in details.get("genres", [])]
+        return item, is_movie
+
+    async def plan(self):
+        """Estimate requests, download size and duration of a run without rendering anything"""
+        self._check_api_keys()
+        print("🧮 Planning TMDB poster generation (dry run)...")
+        
+        async with aiohttp.ClientSession(headers=self.headers, timeout=aiohttp.ClientTimeout(30)) as session:
+            self.session = session
+            movie_genres, tv_genres, unique_movies, unique_tv = await self._discover()
+        
+        discovery_requests = self.stats.get("tmdb", {}).get("count", 0)
+        seconds, sizes = self._load_stage_estimates()
+        
+        candidates = {}
+        for label, items, genres in (("movies", unique_movies, movie_genres), ("tv", unique_tv, tv_genres)):
+            candidates[label] = [
+                item for item in items
+                if self._passes_prefilter(item, genres) and item.get("backdrop_path")
             ]
+            print(f"🔎 {len(candidates[label])} of {len(items)} {label} pass the pre-filters")
+        self.exclusion_rules.report()
+        
+        total = sum(len(items) for items in candidates.values())
+        # A poster budget stops the run early; the most valuable titles come first
+        capped = self.max_posters is not None and self.max_posters < total
+        if capped:
+            existing = {path.name for path in self._locale_output_dir(self.language).glob("*.jpg")} if self.keep_output else set()
+            scheduled = [
+                entry for entry in self._prioritize(unique_movies, movie_genres, unique_tv, tv_genres, existing)
+                if entry[1].get("backdrop_path")
+            ][:self.max_posters]
+            scheduled_ids = {(is_movie, item["id"]) for _, item, _, is_movie in scheduled}
+            candidates = {
+                label: [item for item in candidates[label] if (is_movie, item["id"]) in scheduled_ids]
+                for label, is_movie in (("movies", True), ("tv", False))
+            }
+            total = sum(len(items) for items in candidates.values())
+        
+        # The /changes scan at the start of a run; each window needs at least one page per media type.
+        # A cache older than CACHE_MAX_AGE_DAYS is cleared instead, so nothing is served from it.
+        last_run = self.cache_state.get("last_run")
+        cache_cleared = bool(last_run) and (date.today() - date.fromisoformat(last_run)).days > CACHE_MAX_AGE_DAYS
+        changes_requests = 2 * self._changes_windows() if self._cached_titles() and not cache_cleared else 0
+        
+        # Per candidate: images lookup for the logos, details + credits, then details per extra locale,
+        # minus whatever the response cache already holds
+        extra_locales = len(self.locales) - 1
+        item_requests = 0
+        for label, is_movie in (("movies", True), ("tv", False)):
+            media_type = "movie" if is_movie else "tv"
+            for item in candidates[label]:
+                endpoints = [self._images_endpoint(media_type, item["id"]), f"{media_type}/{item['id']}/credits"]
+                endpoints += [self._details_endpoint(media_type, item["id"], locale) for locale in self.locales]
+                item_requests += sum(cache_cleared or not self._cache_path(endpoint).exists() for endpoint in endpoints)
+        cached_requests = total * (3 + extra_locales) - item_requests
+        tmdb_requests = discovery_requests + changes_requests + item_requests + extra_locales * 2
+        # IMDB id hit is one call; the worst case also tries exact title, search and best match
+        omdb_min, omdb_max = total, total * 4
+        # Backdrop per item and a logo per locale, plus the font once
+        cdn_requests = total * (1 + len(self.locales)) + 1
+        download_bytes = total * (sizes["backdrop"] + sizes["logo"] * len(self.locales))
+        
+        # Titles are spread over RENDER_WORKERS concurrent workers
+        def run_seconds(omdb_calls):
+            per_item = (seconds["tmdb"] * (2 + min(extra_locales, 1)) + seconds["backdrop"] +
+                        (seconds["logo"] + seconds["render"]) * len(self.locales) + seconds["omdb"] * omdb_calls)
+            return total * per_item / RENDER_WORKERS
+        
+        wall_min, wall_max = run_seconds(1), run_seconds(4)
+        
+        print(f"📋 Titles to attempt: {total} ({len(candidates['movies'])} movies, {len(candidates['tv'])} TV shows)"
+              f" in {len(self.locales)} locale(s)")
+        print(f"🌐 TMDB API requests: up to {tmdb_requests} ({discovery_requests} already made for discovery, "
+              f"at least {changes_requests} for /changes, {cached_requests} served from cache)")
+        if changes_requests:
+            print(f"ℹ️  Cached titles that TMDB reports as changed since {last_run} are fetched again; "
+                  f"the cache figure does not include them")
+        print(f"🍅 OMDB API requests: {omdb_min}-{omdb_max} (daily limit {OMDB_DAILY_LIMIT})")
+        print(f"🖼️  CDN downloads: up to {cdn_requests} (~{download_bytes / 1_000_000:.1f} MB)")
+        print(f"⏱️  Estimated wall time: {wall_min / 60:.1f}-{wall_max / 60:.1f} min")
+        
+        if capped:
+            print(f"🎯 --max-posters {self.max_posters}: figures cover the {total} highest priority titles; "
+                  f"titles that fail are replaced by the next ones")
+        if self.deadline is not None and wall_min > self.deadline:
+            print(f"⏰ --deadline {self.deadline / 60:.1f} min is shorter than the estimate; lowest priority titles will be skipped")
+        if omdb_max > OMDB_DAILY_LIMIT:
+            print(f"⚠️  Worst case OMDB usage exceeds the daily limit of {OMDB_DAILY_LIMIT} requests")
+
+    def _check_api_keys(self):
+        """Validate API keys before any request is made"""
+        if API_KEY == "YOUR_TMDB_API_KEY_HERE" or not API_KEY:
+            raise ValueError("Please set your TMDB API key in the API_KEY variable")
+        if OMDB_API_KEY == "YOUR_OMDB_API_KEY_HERE" or not OMDB_API_KEY:
+            raise ValueError("Please set your OMDB API key in the OMDB_API_KEY variable")
+
+    def _locale_output_dir(self, locale: str) -> Path:
+        """Posters go straight into the output folder unless several locales are generated"""
+        return self.output_dir / locale if len(self.locales) > 1 else self.output_dir
+
+    @staticmethod
+    def _locale_language(locale: str) -> str:
+        """ISO 639-1 language of a TMDB locale, as used for image languages"""
+        return locale.split("-")[0].lower()
+
+    async def _load_locale_genres(self, movie_genres: Dict[int, str], tv_genres: Dict[int, str]):
+        """Fetch localized genre names for every locale after the first"""
+        self.locale_genres = {self.language: {True: movie_genres, False: tv_genres}}
+        extra = self.locales[1:]
+        results = await asyncio.gather(*[
+            self._api_get(f"genre/{media_type}/list?language={locale}")
+            for locale in extra for media_type in ("movie", "tv")
+        ])
+        for index, locale in enumerate(extra):
+            localized = {}
+            for is_movie, data in ((True, results[index * 2]), (False, results[index * 2 + 1])):
+                names = {g["id"]: g["name"] for g in data.get("genres", [])}
+                # Keep the primary names for anything the locale doesn't translate
+                fallback = movie_genres if is_movie else tv_genres
+                localized[is_movie] = {**fallback, **names}
+            self.locale_genres[locale] = localized
+
+    async def _discover(self) -> Tuple[Dict[int, str], Dict[int, str], List[Dict], List[Dict]]:
+        """Fetch genre lists and all content sources, returning de-duplicated movies and TV shows"""
+        if self.backend == "discover":
+            # Genre ids are needed to translate genre rules into query parameters
+            genre_results = await asyncio.gather(
+                self._api_get(f"genre/movie/list?language={self.language}"),
+                self._api_get(f"genre/tv/list?language={self.language}")
+            )
+            movie_genres = {g["id"]: g["name"] for g in genre_results[0].get("genres", [])}
+            tv_genres = {g["id"]: g["name"] for g in genre_results[1].get("genres", [])}
             
-            for source_name, tv_shows in tv_sources:
-                print(f"📺 {source_name}: {len(tv_shows)} items")
-                all_tv.extend(tv_shows)
+            movie_sources, tv_sources = await asyncio.gather(
+                self._discover_sources("movie", movie_genres),
+                self._discover_sources("tv", tv_genres)
+            )
+        else:
+            movie_genres, tv_genres, movie_sources, tv_sources = await self._list_sources()
+        
+        # Combine all movie sources
+        all_movies = []
+        for source_name, movies in movie_sources:
+            print(f"📊 {source_name}: {len(movies)} items")
+            all_movies.extend(movies)
+        
+        # Combine all TV sources
+        all_tv = []
+        for source_name, tv_shows in tv_sources:
+            print(f"📺 {source_name}: {len(tv_shows)} items")
+            all_tv.extend(tv_shows)
+        
+        # Remove duplicates based on ID
+        unique_movies = self._remove_duplicates(all_movies)
+        unique_tv = self._remove_duplicates(all_tv)
+        
+        print(f"🎬 Total unique movies: {len(unique_movies)}")
+        print(f"📺 Total unique TV shows: {len(unique_tv)}")
+        
+        return movie_genres, tv_genres, unique_movies, unique_tv
+
+    async def _list_sources(self) -> Tuple[Dict[int, str], Dict[int, str], List[Tuple[str, List[Dict]]], List[Tuple[str, List[Dict]]]]:
+        """Fetch genres and the fixed trending/popular/top rated lists"""
+        # Fetch genres and multiple trending/popular endpoints concurrently
+        results = await asyncio.gather(
+            # Genre lists
+            self._api_get(f"genre/movie/list?language={self.language}"),
+            self._api_get(f"genre/tv/list?language={self.language}"),
             
-            # Remove duplicates based on ID
-            unique_movies = self._remove_duplicates(all_movies)
-            unique_tv = self._remove_duplicates(all_tv)
+            # Movie endpoints - more variety and current content
+            self._api_get(f"trending/movie/day?language={self.language}"),      # Daily trending (most current)
+            self._api_get(f"trending/movie/week?language={self.language}"),     # Weekly trending (original)
+            self._api_get(f"movie/popular?language={self.language}"),           # Popular movies
+            self._api_get(f"movie/now_playing?language={self.language}"),       # Current cinema releases
+            self._api_get(f"movie/top_rated?language={self.language}"),         # Highly rated movies
             
-            print(f"🎬 Total unique movies: {len(unique_movies)}")
-            print(f"📺 Total unique TV shows: {len(unique_tv)}")
+            # TV endpoints - more variety and current content
+            self._api_get(f"trending/tv/day?language={self.language}"),         # Daily trending TV
+            self._api_get(f"trending/tv/week?language={self.language}"),        # Weekly trending TV (original)
+            self._api_get(f"tv/popular?language={self.language}"),              # Popular TV shows
+            self._api_get(f"tv/on_the_air?language={self.language}"),           # Currently airing
+            self._api_get(f"tv/top_rated?language={self.language}")             # Highly rated TV
+        )
+        
+        movie_genres = {g["id"]: g["name"] for g in results[0].get("genres", [])}
+        tv_genres = {g["id"]: g["name"] for g in results[1].get("genres", [])}
+        
+        movie_sources = [
+            ("Daily Trending Movies", results[2].get("results", [])),
+            ("Weekly Trending Movies", results[3].get("results", [])),
+            ("Popular Movies", results[4].get("results", [])),
+            ("Now Playing Movies", results[5].get("results", [])),
+            ("Top Rated Movies", results[6].get("results", []))
+        ]
+        
+        tv_sources = [
+            ("Daily Trending TV", results[7].get("results", [])),
+            ("Weekly Trending TV", results[8].get("results", [])),
+            ("Popular TV", results[9].get("results", [])),
+            ("On The Air TV", results[10].get("results", [])),
+            ("Top Rated TV", results[11].get("results", []))
+        ]
+        
+        # Best position of each title across the daily and weekly trending lists
+        for is_movie, sources in ((True, movie_sources), (False, tv_sources)):
+            for _, trending in sources[:2]:
+                for rank, item in enumerate(trending):
+                    key = (is_movie, item.get("id"))
+                    self.trending_ranks[key] = min(rank, self.trending_ranks.get(key, rank))
+        
+        return movie_genres, tv_genres, movie_sources, tv_sources
+
+    async def _discover_sources(self, media_type: str, genres: Dict[int, str]) -> List[Tuple[str, List[Dict]]]:
+        """Query /discover once per configured sort order, with exclusion rules translated to parameters"""
+        query = self._discover_query(media_type, genres)
+        label = "Movies" if media_type == "movie" else "TV"
+        
+        sources = []
+        for sort in DISCOVER_SORTS:
+            pages = await asyncio.gather(*[
+                self._api_get(f"discover/{media_type}?{query}&sort_by={sort}&page={page}")
+                for page in range(1, DISCOVER_PAGES + 1)
+            ])
+            results = [item for page in pages for item in page.get("results", [])]
+            sources.append((f"Discover {label} ({sort})", results))
             
-            # Process movies and TV shows
-            await asyncio.gather(
-                self._process_items(unique_movies, movie_genres, True),
-                self._process_items(unique_tv, tv_genres, False)
-            )
+            # /discover has no trending order; the most popular titles stand in for the trending lists
+            if sort == "popularity.desc":
+                for rank, item in enumerate(results):
+                    self.trending_ranks.setdefault((media_type == "movie", item.get("id")), rank)
+        return sources
+
+    def _discover_query(self, media_type: str, genres: Dict[int, str]) -> str:
+        """Build the /discover query string from the exclusion rules and vote thresholds"""
+        filters = self.exclusion_rules.server_filters()
+        genre_ids = {ExclusionRules.normalize(name): gid for gid, name in genres.items()}
+        
+        params = {
+            "language": self.language,
+            "include_adult": "false",
+            "vote_count.gte": DISCOVER_MIN_VOTE_COUNT,
+            "vote_average.gte": DISCOVER_MIN_VOTE_AVERAGE,
+        }
+        # Comma-separated without_genres drops items having any of the genres;
+        # pipe-separated with_* values match any of the allowed values
+        excluded = sorted(genre_ids[name] for name in filters["without_genres"] if name in genre_ids)
+        if excluded:
+            params["without_genres"] = ",".join(map(str, excluded))
+        if filters["genre"] is not None:
+            allowed = sorted(genre_ids[name] for name in filters["genre"] if name in genre_ids)
+            params["with_genres"] = "|".join(map(str, allowed))
+        if filters["language"] is not None:
+            params["with_original_language"] = "|".join(sorted(filters["language"]))
+        if filters["country"] is not None:
+            params["with_origin_country"] = "|".join(sorted(c.upper() for c in filters["country"]))
         
-        print("✅ Poster generation completed!")
+        return urlencode(params, safe="|,")
+
+    def _record_stage(self, stage: str, seconds: float, nbytes: int = 0):
+        """Accumulate timing and download size for a pipeline stage"""
+        entry = self.stats.setdefault(stage, {"count": 0, "seconds": 0.0, "bytes": 0})
+        entry["count"] += 1
+        entry["seconds"] += seconds
+        entry["bytes"] += nbytes
+
+    def _load_stage_estimates(self) -> Tuple[Dict[str, float], Dict[str, int]]:
+        """Average per-request seconds and bytes from previous runs, with defaults for unseen stages"""
+        seconds = dict(DEFAULT_STAGE_SECONDS)
+        sizes = dict(DEFAULT_STAGE_BYTES)
+        stats_path = Path(STATS_FILE)
+        if stats_path.exists():
+            try:
+                history = json.loads(stats_path.read_text())
+            except (OSError, ValueError) as e:
+                print(f"⚠️  Could not read {STATS_FILE}: {e}")
+                history = {}
+            for stage, entry in history.items():
+                if entry.get("count"):
+                    seconds[stage] = entry["seconds"] / entry["count"]
+                    if stage in sizes:
+                        sizes[stage] = entry["bytes"] // entry["count"]
+        return seconds, sizes
+
+    def _save_stats(self):
+        """Merge this run's stage timings into the stats file"""
+        stats_path = Path(STATS_FILE)
+        history = {}
+        if stats_path.exists():
+            try:
+                history = json.loads(stats_path.read_text())
+            except (OSError, ValueError):
+                history = {}
+        for stage, entry in self.stats.items():
+            merged = history.setdefault(stage, {"count": 0, "seconds": 0.0, "bytes": 0})
+            for key in ("count", "seconds", "bytes"):
+                merged[key] += entry[key]
+        try:
+            stats_path.write_text(json.dumps(history, indent=2))
+        except OSError as e:
+            print(f"⚠️  Could not write {STATS_FILE}: {e}")
 
     def _remove_duplicates(self, items: List[Dict]) -> List[Dict]:
         """Remove duplicate items based on ID, keeping the first occurrence"""
@@ -149,65 +1147,283 @@ class TMDBPosterGenerator:
         
         return unique_items
 
-    async def _api_get(self, endpoint: str) -> Dict:
-        """Make API request"""
+    async def _api_get(self, endpoint: str, cache: bool = False) -> Dict:
+        """Make API request, optionally served from and stored in the response cache"""
+        if cache:
+            cache_path = self._cache_path(endpoint)
+            if cache_path.exists():
+                try:
+                    data = json.loads(cache_path.read_text())
+                    self._record_stage("tmdb_cached", 0.0)
+                    return data
+                except (OSError, ValueError):
+                    pass
+        
+        started = time.perf_counter()
         try:
             async with self.session.get(f"{BASE_URL}{endpoint}") as response:
-                return await response.json()
+                data = await response.json()
         except Exception as e:
             print(f"❌ API error for {endpoint}: {e}")
             return {}
+        finally:
+            self._record_stage("tmdb", time.perf_counter() - started)
+        
+        # Error responses carry success: false and must not be cached
+        if cache and data and data.get("success", True):
+            try:
+                self.cache_dir.mkdir(parents=True, exist_ok=True)
+                cache_path.write_text(json.dumps(data))
+            except OSError as e:
+                print(f"⚠️  Could not cache {endpoint}: {e}")
+        return data
 
-    async def _process_items(self, items: List[Dict], genres: Dict[int, str], is_movie: bool):
-        """Process movies or TV shows"""
+    def _cache_path(self, endpoint: str) -> Path:
+        """Cache file for an endpoint; names start with <media>_<id>_ so a title's entries can be found"""
+        return self.cache_dir / f"{self._clean_filename(endpoint)}.json"
+
+    def _cached_titles(self) -> Dict[str, List[Path]]:
+        """Cache files grouped by title key ("movie/550")"""
+        titles = {}
+        if self.cache_dir.exists():
+            for path in self.cache_dir.glob("*.json"):
+                match = re.match(r"(movie|tv)_(\d+)_", path.name)
+                if match:
+                    titles.setdefault(f"{match.group(1)}/{match.group(2)}", []).append(path)
+        return titles
+
+    def _load_cache_state(self) -> Dict:
+        """Last successful run date and the titles it produced posters for"""
+        state_path = Path(CACHE_DIR) / "state.json"
+        if state_path.exists():
+            try:
+                return json.loads(state_path.read_text())
+            except (OSError, ValueError) as e:
+                print(f"⚠️  Could not read {state_path}: {e}")
+        return {"last_run": None, "items": {}}
+
+    def _save_cache_state(self, run_date: date, merge: bool):
+        """Record a successful run; without merge only this run's posters are remembered"""
+        items = dict(self.cache_state.get("items", {})) if merge else {}
+        items.update(self.known_items)
+        last_run = run_date.isoformat() if self.changes_checked else self.cache_state.get("last_run")
+        self.cache_state = {"last_run": last_run, "items": items}
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            (self.cache_dir / "state.json").write_text(json.dumps(self.cache_state))
+        except OSError as e:
+            print(f"⚠️  Could not save cache state: {e}")
+
+    async def _invalidate_changed(self) -> List[str]:
+        """Drop cache entries of titles TMDB reports as changed since the last run; returns the changed poster keys"""
+        last_run = self.cache_state.get("last_run")
+        cached = self._cached_titles()
+        if not last_run or not cached:
+            return []
+        
+        start, today = date.fromisoformat(last_run), date.today()
+        posters = self.cache_state.get("items", {})
+        if (today - start).days > CACHE_MAX_AGE_DAYS:
+            print(f"🧹 Last run was {last_run}, clearing the whole response cache")
+            for paths in cached.values():
+                for path in paths:
+                    path.unlink(missing_ok=True)
+            return sorted(posters)
+        
+        movie_ids, tv_ids = await asyncio.gather(
+            self._changed_ids("movie", start, today),
+            self._changed_ids("tv", start, today)
+        )
+        if movie_ids is None or tv_ids is None:
+            # Keep the old last_run so the next run checks this period again
+            print(f"⚠️  Could not get TMDB changes since {last_run}, cached titles may be stale until the next run")
+            self.changes_checked = False
+            return []
+        changed = {f"movie/{i}" for i in movie_ids} | {f"tv/{i}" for i in tv_ids}
+        
+        for key in changed & set(cached):
+            for path in cached[key]:
+                path.unlink(missing_ok=True)
+        changed_posters = sorted(changed & set(posters))
+        print(f"🔄 {len(changed & set(cached))} of {len(cached)} cached titles changed since {last_run}, "
+              f"{len(changed_posters)} with posters")
+        return changed_posters
+
+    def _changes_windows(self) -> int:
+        """Number of CHANGES_WINDOW_DAYS windows the next /changes scan covers"""
+        last_run = self.cache_state.get("last_run")
+        if not last_run:
+            return 0
+        days = (date.today() - date.fromisoformat(last_run)).days
+        return max(1, math.ceil(days / CHANGES_WINDOW_DAYS))
+
+    async def _changed_ids(self, media_type: str, start: date, end: date) -> Optional[set]:
+        """All ids reported by /<media>/changes between two dates, in 14-day windows; None if a page failed"""
+        ids = set()
+        slots = asyncio.Semaphore(CHANGES_CONCURRENCY)
+        
+        async def get_page(endpoint):
+            async with slots:
+                return await self._api_get(endpoint)
+        
+        window_start = start
+        while True:
+            window_end = min(window_start + timedelta(days=CHANGES_WINDOW_DAYS), end)
+            query = f"{media_type}/changes?start_date={window_start.isoformat()}&end_date={window_end.isoformat()}"
+            first = await self._api_get(f"{query}&page=1")
+            rest = await asyncio.gather(*[
+                get_page(f"{query}&page={page}") for page in range(2, first.get("total_pages", 1) + 1)
+            ])
+            for page in [first] + list(rest):
+                # Failed requests come back empty and error bodies have no results
+                if "results" not in page:
+                    return None
+                ids.update(result["id"] for result in page.get("results", []) if "id" in result)
+            if window_end >= end:
+                return ids
+            # Windows share their boundary day; both ends are inclusive
+            window_start = window_end
+
+    def _prioritize(self, movies: List[Dict], movie_genres: Dict[int, str], tv_shows: List[Dict],
+                    tv_genres: Dict[int, str], existing: set) -> List[Tuple[float, Dict, Dict[int, str], bool]]:
+        """Pre-filter all titles and order them by weighted priority score, highest first"""
+        candidates = [
+            (item, genres, is_movie)
+            for items, genres, is_movie in ((movies, movie_genres, True), (tv_shows, tv_genres, False))
+            for item in items if self._passes_prefilter(item, genres)
+        ]
+        if not candidates:
+            return []
+        
+        max_popularity = math.log1p(max(item.get("popularity", 0) or 0 for item, _, _ in candidates))
+        max_votes = math.log1p(max(item.get("vote_count", 0) or 0 for item, _, _ in candidates))
+        today = date.today()
+        
+        scored = []
+        for item, genres, is_movie in candidates:
+            rank = self.trending_ranks.get((is_movie, item.get("id")))
+            features = {
+                # TMDB list pages hold 20 titles; anything deeper counts as not trending
+                "trending": max(0.0, 1 - rank / 20) if rank is not None else 0.0,
+                "popularity": math.log1p(item.get("popularity", 0) or 0) / max_popularity if max_popularity else 0.0,
+                "vote_count": math.log1p(item.get("vote_count", 0) or 0) / max_votes if max_votes else 0.0,
+                "freshness": self._freshness(item, is_movie, today),
+                "missing": 0.0 if self._poster_filename(item, is_movie) in existing else 1.0,
+            }
+            score = sum(PRIORITY_WEIGHTS.get(name, 0) * value for name, value in features.items())
+            scored.append((score, item, genres, is_movie))
+        
+        scored.sort(key=lambda entry: entry[0], reverse=True)
+        print(f"🏁 {len(scored)} titles queued by priority")
+        return scored
+
+    def _freshness(self, item: Dict, is_movie: bool, today: date) -> float:
+        """1.0 for new or upcoming releases, halving every FRESHNESS_HALF_LIFE_DAYS"""
+        released = item.get("release_date" if is_movie else "first_air_date") or ""
+        try:
+            age_days = (today - datetime.strptime(released[:10], "%Y-%m-%d").date()).days
+        except ValueError:
+            return 0.0
+        return 0.5 ** (max(age_days, 0) / FRESHNESS_HALF_LIFE_DAYS)
+
+    async def _process_queue(self, scheduled: List[Tuple[float, Dict, Dict[int, str], bool]]):
+        """Process titles in priority order with RENDER_WORKERS workers until the queue or a budget runs out"""
+        pending = deque(scheduled)
+        self._in_flight = 0
+        self._budget_changed = asyncio.Condition()
+        
+        async def worker():
+            while pending:
+                if not await self._wait_for_budget():
+                    return
+                # Another worker may have taken the last title while this one waited
+                if not pending:
+                    return
+                _, item, genres, is_movie = pending.popleft()
+                self._in_flight += 1
+                try:
+                    await self._process_item(item, genres, is_movie)
+                finally:
+                    async with self._budget_changed:
+                        self._in_flight -= 1
+                        self._budget_changed.notify_all()
+        
+        await asyncio.gather(*[worker() for _ in range(RENDER_WORKERS)])
+        await asyncio.gather(*list(self._title_writes))
+        
+        if pending:
+            print(f"⏹️  Budget reached, {len(pending)} lower priority titles not started")
+
+    async def _wait_for_budget(self) -> bool:
+        """Wait until another title may start; False once the poster or time budget is used up.
+        
+        Titles in flight or still being written count against --max-posters, since any of them
+        may still produce a poster.
+        """
+        async with self._budget_changed:
+            while True:
+                remaining = self._deadline_at - time.monotonic() if self._deadline_at is not None else None
+                if remaining is not None and remaining <= 0:
+                    return False
+                if self.max_posters is None:
+                    return True
+                if self.posters_created >= self.max_posters:
+                    return False
+                if self.posters_created + self._in_flight + len(self._title_writes) < self.max_posters:
+                    return True
+                try:
+                    await asyncio.wait_for(self._budget_changed.wait(), remaining)
+                except asyncio.TimeoutError:
+                    return False
+
+    async def _process_item(self, item: Dict, genres: Dict[int, str], is_movie: bool):
+        """Fetch everything a title needs and create its poster"""
         media_type = "movie" if is_movie else "tv"
         name_key = "title" if is_movie else "name"
         
-        for item in items:
-            try:
-                # Quick validation
-                if (item.get("vote_average", 0) == 0 or 
-                    not item.get("overview", "").strip() or
-                    self._should_exclude(item, genres)):
-                    continue
-                
-                # Check for backdrop (required)
-                if not item.get("backdrop_path"):
-                    print(f"⚠️  Skipping {item.get(name_key, 'Unknown')}: No backdrop image available")
-                    continue
-                
-                # Check for logo (required)
-                logo_path = await self._get_logo(media_type, item["id"])
-                if not logo_path:
-                    print(f"⚠️  Skipping {item.get(name_key, 'Unknown')}: No logo available")
-                    continue
-                
-                # Get details and credits (both required)
-                details, credits = await asyncio.gather(
-                    self._api_get(f"{media_type}/{item['id']}?language=en-US"),
-                    self._api_get(f"{media_type}/{item['id']}/credits")
-                )
-                
-                # Validate details
-                if not details or not details.get("id"):
-                    print(f"⚠️  Skipping {item.get(name_key, 'Unknown')}: Could not fetch details")
-                    continue
-                
-                # Validate credits
-                if not credits or (not credits.get("cast") and not credits.get("crew")):
-                    print(f"⚠️  Skipping {item.get(name_key, 'Unknown')}: No cast or crew information available")
-                    continue
-                
-                # Check for minimum cast (at least 1 actor)
-                if not credits.get("cast") or len(credits.get("cast", [])) == 0:
-                    print(f"⚠️  Skipping {item.get(name_key, 'Unknown')}: No cast information available")
-                    continue
-                
-                await self._create_poster(item, details, credits, genres, is_movie)
-                
-            except Exception as e:
-                print(f"❌ Error processing {item.get(name_key, 'Unknown')}: {e}")
-                continue
+        try:
+            # Check for backdrop (required)
+            if not item.get("backdrop_path"):
+                print(f"⚠️  Skipping {item.get(name_key, 'Unknown')}: No backdrop image available")
+                return
+            
+            # Check for logo in the primary language (required)
+            logos = await self._get_logos(media_type, item["id"])
+            if self._locale_language(self.language) not in logos:
+                print(f"⚠️  Skipping {item.get(name_key, 'Unknown')}: No logo available")
+                return
+            
+            # Get details and credits (both required)
+            details, credits = await asyncio.gather(
+                self._api_get(self._details_endpoint(media_type, item["id"], self.language), cache=True),
+                self._api_get(f"{media_type}/{item['id']}/credits", cache=True)
+            )
+            
+            # Validate details
+            if not details or not details.get("id"):
+                print(f"⚠️  Skipping {item.get(name_key, 'Unknown')}: Could not fetch details")
+                return
+            
+            # Validate credits
+            if not credits or (not credits.get("cast") and not credits.get("crew")):
+                print(f"⚠️  Skipping {item.get(name_key, 'Unknown')}: No cast or crew information available")
+                return
+            
+            # Check for minimum cast (at least 1 actor)
+            if not credits.get("cast") or len(credits.get("cast", [])) == 0:
+                print(f"⚠️  Skipping {item.get(name_key, 'Unknown')}: No cast information available")
+                return
+            
+            await self._create_poster(item, details, credits, genres, is_movie, logos)
+            
+        except Exception as e:
+            print(f"❌ Error processing {item.get(name_key, 'Unknown')}: {e}")
+
+    def _passes_prefilter(self, item: Dict, genres: Dict[int, str]) -> bool:
+        """Cheap checks that need no extra requests: rating, overview and exclusion filters"""
+        return (item.get("vote_average", 0) != 0 and
+                bool(item.get("overview", "").strip()) and
+                not self._should_exclude(item, genres))
 
     async def _get_ratings(self, item: Dict, details: Dict) -> Dict:
         """Get both Rotten Tomatoes and Metacritic ratings from OMDB API with fuzzy matching fallback"""
@@ -245,6 +1461,7 @@ class TMDBPosterGenerator:
 
     async def _search_omdb_fuzzy(self, title: str, year: str) -> List[Dict]:
         """Search OMDB and find similar titles using fuzzy matching"""
+        started = time.perf_counter()
         try:
             # Search OMDB for similar titles
             params = {
@@ -290,9 +1507,12 @@ class TMDBPosterGenerator:
         except Exception as e:
             print(f"⚠️  OMDB search failed: {e}")
             return []
+        finally:
+            self._record_stage("omdb", time.perf_counter() - started)
 
     async def _fetch_omdb_ratings(self, params: Dict) -> Dict:
         """Fetch ratings from OMDB API with given parameters"""
+        started = time.perf_counter()
         try:
             # Add API key to params
             params["apikey"] = OMDB_API_KEY
@@ -341,164 +1561,270 @@ class TMDBPosterGenerator:
         except Exception as e:
             print(f"⚠️  OMDB API request failed: {e}")
             return {"rt_score": None, "certified_fresh": False, "metacritic_score": None}
+        finally:
+            self._record_stage("omdb", time.perf_counter() - started)
 
     def _should_exclude(self, item: Dict, genres: Dict[int, str]) -> bool:
         """Check if item should be excluded based on configured filters"""
-        # Get country
-        origin = item.get("origin_country", "")
-        country = (origin[0] if isinstance(origin, list) and origin else origin).lower()
-        
-        # Get genres
-        item_genres = [genres.get(gid, "") for gid in item.get("genre_ids", [])]
-        
-        # Get original language
-        original_language = item.get("original_language", "").lower()
-        
-        # Get title for keyword filtering
-        title = (item.get("title") or item.get("name", "")).lower()
-        
-        # Check for excluded countries
-        # Example: Exclude Chinese, Korean, Indian content
-        if country in EXCLUDED_COUNTRIES:
-            return True
-        
-        # Language-based filtering (customize as needed)
-        # Example: Exclude Hindi, Tamil, Telugu, or other specific languages
-        # indian_languages = ["hi", "ta", "te", "kn", "ml", "bn", "gu", "mr", "pa", "or", "as", "ur"]
-        # if original_language in indian_languages:
-        #     return True
-        
-        # Title-based keyword filtering (customize as needed)
-        # Example: Exclude content with specific keywords in the title
-        # bollywood_keywords = ["bollywood", "hindi", "tamil", "telugu", "kannada", "malayalam", "bengali"]
-        # if any(keyword in title for keyword in bollywood_keywords):
-        #     return True
-        
-        # Talk show filtering by title keywords (customize as needed)
-        # Example: Filter out talk shows and late night shows
-        # talk_show_keywords = [
-        #     "tonight show", "late show", "late night", "daily show", "talk show",
-        #     "with stephen", "with jimmy", "with trevor", "with john", "with bill",
-        #     "real time", "last week tonight", "saturday night live", "snl",
-        #     "the view", "the talk", "good morning", "morning show", "today show",
-        #     "meet the press", "face the nation", "this week", "state of the union",
-        #     "tucker carlson", "sean hannity", "rachel maddow", "anderson cooper",
-        #     "bill maher", "conan", "ellen", "oprah", "dr. phil", "jerry springer"
-        # ]
-        # if any(keyword in title for keyword in talk_show_keywords):
-        #     return True
-        
-        # Animation filtering (customize as needed)
-        # Example: Allow Western animation but exclude Asian animation (anime)
-        # if "Animation" in item_genres:
-        #     western_countries = ["us", "ca", "gb", "au", "nz", "ie", "fr", "de", "es", "it", "nl", "be", "dk", "se", "no", "fi"]
-        #     asian_countries = ["jp", "kr", "cn", "tw", "hk", "th", "sg", "my", "id", "ph", "vn", "in", "pk", "bd", "lk", "mm", "kh", "la", "mn", "uz", "kz", "kg", "tj", "tm", "af"]
-        #     
-        #     if country in asian_countries:
-        #         return True  # Exclude Asian animation
-        #     elif country in western_countries:
-        #         pass  # Allow Western animation
-        #     else:
-        #         return True  # Exclude unknown origin animation
-        
-        # Check excluded genres from configuration
-        if any(g in EXCLUDED_GENRES for g in item_genres):
-            return True
-        
-        # Check excluded keywords in title
-        if any(keyword in title for keyword in EXCLUDED_KEYWORDS):
-            return True
-        
-        return False
+        return self.exclusion_rules.match(item, genres) is not None
+
+    def _details_endpoint(self, media_type: str, media_id: int, locale: str) -> str:
+        return f"{media_type}/{media_id}?language={locale}"
+
+    def _images_endpoint(self, media_type: str, media_id: int) -> str:
+        """One images request returns the logos for every locale language"""
+        languages = sorted({self._locale_language(locale) for locale in self.locales})
+        return f"{media_type}/{media_id}/images?language={languages[0]}&include_image_language={','.join(languages)}"
 
-    async def _get_logo(self, media_type: str, media_id: int) -> Optional[str]:
-        """Get logo path"""
-        data = await self._api_get(f"{media_type}/{media_id}/images?language=en")
+    async def _get_logos(self, media_type: str, media_id: int) -> Dict[str, str]:
+        """Get the first PNG logo path for each locale language, from a single images request"""
+        languages = {self._locale_language(locale) for locale in self.locales}
+        data = await self._api_get(self._images_endpoint(media_type, media_id), cache=True)
+        logos = {}
         for logo in data.get("logos", []):
-            if logo.get("iso_639_1") == "en" and logo.get("file_path", "").endswith(".png"):
-                return logo["file_path"]
-        return None
+            language = logo.get("iso_639_1")
+            if language in languages and language not in logos and logo.get("file_path", "").endswith(".png"):
+                logos[language] = logo["file_path"]
+        return logos
 
-    async def _create_poster(self, item: Dict, details: Dict, credits: Dict, genres: Dict[int, str], is_movie: bool):
-        """Create the poster image"""
+    async def _create_poster(self, item: Dict, details: Dict, credits: Dict, genres: Dict[int, str],
+                             is_movie: bool, logos: Dict[str, str]):
+        """Fetch the remaining assets and ratings, then render every locale or record the title in the snapshot"""
         backdrop_path = item.get("backdrop_path")
         if not backdrop_path:
             return
         
         try:
-            # Download backdrop with error handling
-            backdrop_url = f"{IMAGE_BASE}{backdrop_path}"
-            async with self.session.get(backdrop_url) as response:
-                if response.status != 200:
-                    print(f"❌ Failed to download backdrop: HTTP {response.status}")
-                    return
-                backdrop_data = await response.read()
-                if not backdrop_data:
-                    print(f"❌ Empty backdrop data received")
-                    return
+            backdrop_data = await self._download_image(backdrop_path, "backdrop")
+            if backdrop_data is None:
+                return
             
-            # Load required local images with error handling
-            script_dir = Path(__file__).parent
-            required_files = {
-                "background": "bckg.png",
-                "overlay": "overlay.png", 
-                "tmdb_logo": "tmdblogo.png"
-            }
+            # Rating with Rotten Tomatoes and Metacritic data, TMDB fallback
+            ratings_data = await self._get_ratings(item, details)
+            localized_items = await self._localize_item(item, is_movie)
             
-            loaded_images = {}
-            for name, filename in required_files.items():
-                file_path = script_dir / filename
-                if not file_path.exists():
-                    print(f"❌ Required file missing: {filename}")
-                    return
-                try:
-                    loaded_images[name] = Image.open(file_path).convert("RGBA")
-                except Exception as e:
-                    print(f"❌ Failed to load {filename}: {e}")
-                    return
+            # Everything needed to draw the poster; the same shape is stored in snapshots
+            record = {"is_movie": is_movie, "details": self._poster_details(details), "credits": self._poster_credits(credits),
+                      "ratings": ratings_data, "locales": {}}
+            logo_data = {}
+            for locale in self.locales:
+                localized_item = localized_items[locale]
+                locale_genres = genres if locale == self.language else self.locale_genres[locale][is_movie]
+                
+                # Fall back to the primary-language logo when the locale has none
+                logo_path = logos.get(self._locale_language(locale)) or logos.get(self._locale_language(self.language))
+                if logo_path and logo_path not in logo_data:
+                    logo_data[logo_path] = await self._download_image(logo_path, "logo")
+                
+                record["locales"][locale] = {
+                    "item": localized_item,
+                    "genres": {gid: locale_genres.get(gid, "") for gid in localized_item.get("genre_ids", [])},
+                    "logo": logo_path,
+                }
             
-            # Load backdrop image
-            try:
-                backdrop = Image.open(BytesIO(backdrop_data))
-            except Exception as e:
-                print(f"❌ Failed to process backdrop image: {e}")
+            if self.snapshot is not None:
+                await self.snapshot.add(record, backdrop_data, logo_data)
+            else:
+                font_title = await self._get_font(190)
+                font_text = await self._get_font(50)
+                started = time.perf_counter()
+                posters = self._render_record(record, backdrop_data, logo_data, font_title, font_text)
+                # Recorded per locale, as --plan scales render time by the locale count
+                elapsed = time.perf_counter() - started
+                for _ in posters:
+                    self._record_stage("render", elapsed / len(posters))
+                
+                # Encoding and writing happen on the writer thread; the title counts once a file is written
+                writes = []
+                for filename, background in posters:
+                    self._remove_stale_posters(filename)
+                    written = await self.writer.submit(background, filename)
+                    written.add_done_callback(lambda future, filename=filename: self._on_poster_written(future, filename))
+                    writes.append(written)
+                if writes:
+                    title_written = asyncio.ensure_future(self._title_written(item, is_movie, writes))
+                    self._title_writes.add(title_written)
+                    title_written.add_done_callback(self._title_writes.discard)
                 return
             
-            # Resize and compose
-            backdrop_resized = self._resize_image(backdrop, 1500)
-            background = loaded_images["background"]
-            background.paste(backdrop_resized, (1175, 0))
-            background.paste(loaded_images["overlay"], (1175, 0), loaded_images["overlay"])
-            
-            # Add all content
-            await self._add_content(background, item, details, credits, genres, loaded_images["tmdb_logo"], is_movie)
-            
-            # Save with optimizations for Reddit/ProjectiVy
-            title = item.get("title" if is_movie else "name", "unknown")
-            filename = self.output_dir / f"{self._clean_filename(title)}.jpg"
-            background.convert('RGB').save(
-                filename, 
-                format='JPEG',
-                quality=95, 
-                optimize=True,
-                progressive=True,
-                exif=b''  # Strip all metadata
-            )
-            print(f"✅ Created: {filename.name}")
+            self._count_title(item, is_movie)
             
         except Exception as e:
             title = item.get("title" if is_movie else "name", "Unknown")
             print(f"❌ Poster creation failed for {title}: {e}")
 
-    async def _add_content(self, img: Image.Image, item: Dict, details: Dict, credits: Dict, 
-                          genres: Dict[int, str], tmdb_logo: Image.Image, is_movie: bool):
+    @staticmethod
+    def _poster_details(details: Dict) -> Dict:
+        """The details fields a poster shows, keeping snapshot lines small"""
+        return {
+            "runtime": details.get("runtime", 0),
+            "number_of_seasons": details.get("number_of_seasons", 0),
+            "created_by": [{"name": creator["name"]} for creator in details.get("created_by", [])],
+        }
+
+    @staticmethod
+    def _poster_credits(credits: Dict) -> Dict:
+        """Top billed cast and the crew _add_credits can show, instead of the full credits"""
+        return {
+            "cast": [{"name": actor["name"]} for actor in credits.get("cast", [])[:3]],
+            "crew": [{"name": crew["name"], "job": crew["job"]} for crew in credits.get("crew", [])
+                     if crew.get("job") in ("Director", "Producer", "Executive Producer")],
+        }
+
+    def _render_record(self, record: Dict, backdrop_data: bytes, logo_data: Dict[str, Optional[bytes]],
+                       font_title: ImageFont.FreeTypeFont, font_text: ImageFont.FreeTypeFont) -> List[Tuple[Path, Image.Image]]:
+        """Render all locales of a title from raw image bytes; returns (output file, poster) pairs"""
+        try:
+            backdrop = Image.open(BytesIO(backdrop_data))
+        except Exception as e:
+            raise ValueError(f"Failed to process backdrop image: {e}")
+        
+        # Backdrop, overlay and template are the same in every locale
+        base = self._compose_base(backdrop)
+        if base is None:
+            return []
+        
+        logo_images = {}
+        for logo_path, data in logo_data.items():
+            try:
+                logo_images[logo_path] = Image.open(BytesIO(data)).convert("RGBA") if data else None
+            except Exception as e:
+                print(f"⚠️  Failed to process logo image: {e}")
+                logo_images[logo_path] = None
+        
+        is_movie = record["is_movie"]
+        posters = []
+        for locale, localized in record["locales"].items():
+            # Genre ids come back from JSON snapshots as strings
+            genres = {int(gid): name for gid, name in localized["genres"].items()}
+            background = self._render_poster(base, logo_images.get(localized["logo"]), localized["item"],
+                                             record["details"], record["credits"], genres, record["ratings"],
+                                             is_movie, font_title, font_text)
+            filename = self._locale_output_dir(locale) / self._poster_filename(localized["item"], is_movie)
+            posters.append((filename, background))
+        return posters
+
+    async def _localize_item(self, item: Dict, is_movie: bool) -> Dict[str, Dict]:
+        """Item copies with title and overview translated for each locale, keyed by locale"""
+        localized_items = {self.language: item}
+        extra = self.locales[1:]
+        if not extra:
+            return localized_items
+        
+        media_type = "movie" if is_movie else "tv"
+        name_key = "title" if is_movie else "name"
+        translations = await asyncio.gather(*[
+            self._api_get(self._details_endpoint(media_type, item["id"], locale), cache=True) for locale in extra
+        ])
+        for locale, translated in zip(extra, translations):
+            # TMDB returns empty strings for missing translations; keep the primary text then
+            localized_items[locale] = {
+                **item,
+                name_key: translated.get(name_key) or item.get(name_key, ""),
+                "overview": (translated.get("overview") or "").strip() or item.get("overview", ""),
+            }
+        return localized_items
+
+    async def _title_written(self, item: Dict, is_movie: bool, writes: List[asyncio.Future]):
+        """Count a title once its posters are on disk; it holds a --max-posters slot until then"""
+        results = await asyncio.gather(*writes, return_exceptions=True)
+        if any(not isinstance(result, BaseException) for result in results):
+            self._count_title(item, is_movie)
+        # Release the slot before waking workers, so they see the final count
+        self._title_writes.discard(asyncio.current_task())
+        if self._budget_changed is not None:
+            async with self._budget_changed:
+                self._budget_changed.notify_all()
+
+    def _count_title(self, item: Dict, is_movie: bool):
+        """Count a finished title towards --max-posters and remember it for --refresh"""
+        self.known_items[f"{'movie' if is_movie else 'tv'}/{item['id']}"] = {"item": item, "is_movie": is_movie}
+        self.posters_created += 1
+
+    def _on_poster_written(self, future: asyncio.Future, filename: Path):
+        """Report the outcome of a background write"""
+        if future.exception() is not None:
+            print(f"❌ Failed to write {filename.name}: {future.exception()}")
+            return
+        self._record_stage("write", future.result())
+        print(f"✅ Created: {filename.name}")
+
+    async def _download_image(self, image_path: str, stage: str) -> Optional[bytes]:
+        """Download a backdrop or logo from the image CDN, returning None on failure"""
+        image_url = f"{IMAGE_BASE}{image_path}"
+        try:
+            started = time.perf_counter()
+            async with self.session.get(image_url) as response:
+                if response.status != 200:
+                    print(f"⚠️  Failed to download {stage}: HTTP {response.status}")
+                    return None
+                data = await response.read()
+            if not data:
+                print(f"⚠️  Empty {stage} data received")
+                return None
+            self._record_stage(stage, time.perf_counter() - started, len(data))
+            return data
+        except Exception as e:
+            print(f"⚠️  {stage.capitalize()} download failed: {e}")
+            return None
+
+    def _load_templates(self) -> Optional[Dict[str, Image.Image]]:
+        """Load the local template images once; None if any is missing or unreadable"""
+        if self._templates is not None:
+            return self._templates
+        
+        # Load required local images with error handling
+        script_dir = Path(__file__).parent
+        required_files = {
+            "background": "bckg.png",
+            "overlay": "overlay.png", 
+            "tmdb_logo": "tmdblogo.png"
+        }
+        
+        loaded_images = {}
+        for name, filename in required_files.items():
+            file_path = script_dir / filename
+            if not file_path.exists():
+                print(f"❌ Required file missing: {filename}")
+                return None
+            try:
+                loaded_images[name] = Image.open(file_path).convert("RGBA")
+            except Exception as e:
+                print(f"❌ Failed to load {filename}: {e}")
+                return None
+        
+        self._templates = loaded_images
+        return loaded_images
+
+    def _compose_base(self, backdrop: Image.Image) -> Optional[Image.Image]:
+        """Background template with the backdrop and overlay applied, shared by all locale renders"""
+        templates = self._load_templates()
+        if templates is None:
+            return None
+        
+        # Resize and compose
+        backdrop_resized = self._resize_image(backdrop, 1500)
+        background = templates["background"].copy()
+        background.paste(backdrop_resized, (1175, 0))
+        background.paste(templates["overlay"], (1175, 0), templates["overlay"])
+        return background
+
+    def _render_poster(self, base: Image.Image, logo_img: Optional[Image.Image], item: Dict, details: Dict,
+                       credits: Dict, genres: Dict[int, str], ratings_data: Dict, is_movie: bool,
+                       font_title: ImageFont.FreeTypeFont, font_text: ImageFont.FreeTypeFont) -> Image.Image:
+        """Draw the text, ratings and logo onto a copy of the composed base; does no network I/O"""
+        background = base.copy()
+        self._add_content(background, item, details, credits, genres, self._load_templates()["tmdb_logo"], is_movie,
+                          ratings_data, logo_img, font_title, font_text)
+        return background
+
+    def _add_content(self, img: Image.Image, item: Dict, details: Dict, credits: Dict, 
+                     genres: Dict[int, str], tmdb_logo: Image.Image, is_movie: bool, ratings_data: Dict,
+                     logo_img: Optional[Image.Image], font_title: ImageFont.FreeTypeFont,
+                     font_text: ImageFont.FreeTypeFont):
         """Add all text and elements to the poster"""
         draw = ImageDraw.Draw(img)
         
-        # Load fonts
-        font_title = await self._get_font(190)
-        font_text = await self._get_font(50)
-        
         # Positions and colors
         title_pos = (200, 420)
         info_pos = (210, 650)
@@ -534,9 +1860,6 @@ class TMDBPosterGenerator:
         
         self._draw_text_with_shadow(draw, (info_text_x, info_pos[1]), info_text, font_text, (150, 150, 150))
         
-        # Rating with Rotten Tomatoes and Metacritic data, TMDB fallback
-        ratings_data = await self._get_ratings(item, details)
-        
         # Check if we have ANY rating available
         has_external_rating = ratings_data["rt_score"] is not None or ratings_data["metacritic_score"] is not None
         has_tmdb_rating = item.get('vote_average', 0) > 0
@@ -546,10 +1869,10 @@ class TMDBPosterGenerator:
             print(f"⚠️  Skipping {title}: No ratings available from any source")
             return
         
-        await self._add_ratings(draw, img, ratings_data, info_text, info_text_x, info_pos, font_text, item)
+        self._add_ratings(draw, img, ratings_data, info_text, info_text_x, info_pos, font_text, item)
         
         # Credits with original gray colors
-        credits_y = await self._add_credits(draw, img, credits, info_pos[1] + 80, font_text, is_movie, details)
+        credits_y = self._add_credits(draw, img, credits, info_pos[1] + 80, font_text, is_movie, details)
         
         # Overview with original gray colors
         overview = item.get('overview', '')
@@ -557,11 +1880,9 @@ class TMDBPosterGenerator:
         self._draw_text_with_shadow(draw, (210, credits_y + 25), wrapped_overview, font_text, (150, 150, 150))
         
         # Title or logo with error handling
-        media_type = "movie" if is_movie else "tv"
-        logo_path = await self._get_logo(media_type, item["id"])
-        await self._add_title_or_logo(draw, img, item, logo_path, title_pos, font_title, info_pos, is_movie)
+        self._add_title_or_logo(draw, img, item, logo_img, title_pos, font_title, info_pos, is_movie)
 
-    async def _add_ratings(self, draw, img, ratings_data, info_text, info_text_x, info_pos, font, item):
+    def _add_ratings(self, draw, img, ratings_data, info_text, info_text_x, info_pos, font, item):
         """Add both Rotten Tomatoes and Metacritic ratings, with TMDB fallback"""
         script_dir = Path(__file__).parent
         current_x = info_text_x
@@ -667,7 +1988,7 @@ class TMDBPosterGenerator:
             else:
                 print("⚠️  No ratings available (external or TMDB)")
 
-    async def _add_credits(self, draw, img, credits, start_y, font, is_movie, details):
+    def _add_credits(self, draw, img, credits, start_y, font, is_movie, details):
         """Add cast and crew credits"""
         # Get top actors (only show famous ones, no +number)
         cast_list = credits.get('cast', [])
@@ -800,26 +2121,16 @@ class TMDBPosterGenerator:
         
         return start_y + 55
 
-    async def _add_title_or_logo(self, draw, img, item, logo_path, title_pos, font_title, info_pos, is_movie):
-        """Add title text or logo with error handling"""
-        if logo_path:
-            logo_url = f"{IMAGE_BASE}{logo_path}"
+    def _add_title_or_logo(self, draw, img, item, logo_img, title_pos, font_title, info_pos, is_movie):
+        """Add the logo, or the title text when no logo could be loaded"""
+        if logo_img is not None:
             try:
-                async with self.session.get(logo_url) as response:
-                    if response.status == 200:
-                        logo_data = await response.read()
-                        if logo_data:
-                            logo_img = Image.open(BytesIO(logo_data)).convert("RGBA")
-                            logo_resized = self._resize_logo(logo_img, 1344, 672)
-                            logo_y = info_pos[1] - logo_resized.height - 40
-                            img.paste(logo_resized, (210, logo_y), logo_resized)
-                            return
-                        else:
-                            print(f"⚠️  Empty logo data received")
-                    else:
-                        print(f"⚠️  Failed to download logo: HTTP {response.status}")
+                logo_resized = self._resize_logo(logo_img, 1344, 672)
+                logo_y = info_pos[1] - logo_resized.height - 40
+                img.paste(logo_resized, (210, logo_y), logo_resized)
+                return
             except Exception as e:
-                print(f"⚠️  Logo download failed: {e}")
+                print(f"⚠️  Logo placement failed: {e}")
         
         # Fallback to text title
         title = item.get("title" if is_movie else "name", "")
@@ -829,13 +2140,21 @@ class TMDBPosterGenerator:
             print(f"⚠️  No title available for fallback text")
 
     async def _get_font(self, size: int) -> ImageFont.FreeTypeFont:
-        """Get font with caching"""
-        if size not in self.font_cache:
+        """Get font with caching; the font file is downloaded once for all sizes"""
+        if self.font_data is None:
             try:
                 async with self.session.get(FONT_URL) as response:
-                    font_data = await response.read()
-                self.font_cache[size] = ImageFont.truetype(BytesIO(font_data), size=size)
-            except:
+                    self.font_data = await response.read()
+            except Exception:
+                self.font_data = b""
+        return self._load_font(size)
+
+    def _load_font(self, size: int) -> ImageFont.FreeTypeFont:
+        """Font at a size from the downloaded font data, or Pillow's default font"""
+        if size not in self.font_cache:
+            try:
+                self.font_cache[size] = ImageFont.truetype(BytesIO(self.font_data), size=size)
+            except Exception:
                 self.font_cache[size] = ImageFont.load_default()
         return self.font_cache[size]
 
@@ -875,6 +2194,19 @@ class TMDBPosterGenerator:
         
         return img.resize((width, height), Image.Resampling.LANCZOS)
 
+    def _poster_filename(self, item: Dict, is_movie: bool) -> str:
+        """Output file name; the media type and TMDB id keep titles that clean to the same name apart"""
+        title = item.get("title" if is_movie else "name", "unknown")
+        media_type = "movie" if is_movie else "tv"
+        return f"{self._clean_filename(title)}_{media_type}-{item['id']}.jpg"
+
+    def _remove_stale_posters(self, filename: Path):
+        """Delete earlier posters of the same title saved under an old or differently translated name"""
+        media_and_id = filename.name.rsplit("_", 1)[-1]
+        for stale in filename.parent.glob(f"*_{media_and_id}"):
+            if stale != filename:
+                stale.unlink(missing_ok=True)
+
     def _clean_filename(self, filename: str) -> str:
         """Clean filename for filesystem"""
         return "".join(c if c.isalnum() or c in "._-" else "_" for c in filename)
@@ -884,9 +2216,63 @@ class TMDBPosterGenerator:
 # MAIN EXECUTION
 # =============================================================================
 
+def _parse_deadline(value: str) -> float:
+    """Seconds from now, given either a number of seconds or the next occurrence of a local HH:MM"""
+    if ":" not in value:
+        return float(value)
+    now = datetime.now()
+    try:
+        at = datetime.combine(now.date(), datetime.strptime(value, "%H:%M").time())
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid deadline {value!r}, expected seconds or HH:MM")
+    if at <= now:
+        at += timedelta(days=1)
+    return (at - now).total_seconds()
+
+
 async def main():
-    generator = TMDBPosterGenerator()
-    await generator.run()
+    parser = argparse.ArgumentParser(description="Generate movie and TV wallpapers from TMDB and OMDB data")
+    parser.add_argument("command", nargs="?", choices=["run", "fetch", "render"], default="run",
+                        help="run: fetch and render (default); fetch: only record a snapshot; "
+                             "render: build posters offline from a snapshot")
+    parser.add_argument("--snapshot", default=SNAPSHOT_DIR,
+                        help=f"snapshot folder for the fetch and render commands (default {SNAPSHOT_DIR})")
+    parser.add_argument("--workers", type=int, default=RENDER_PROCESSES,
+                        help="render processes for the render command (default: one per CPU)")
+    parser.add_argument("--plan", action="store_true",
+                        help="dry run: estimate API calls, download size and run time without rendering")
+    parser.add_argument("--backend", choices=["lists", "discover"], default=DISCOVERY_BACKEND,
+                        help="where to find titles: fixed TMDB lists or filtered /discover queries")
+    parser.add_argument("--profile", action="store_true",
+                        help=f"profile the run with cProfile, tracemalloc and a stack sampler into {PROFILE_DIR}/")
+    parser.add_argument("--locales", default=",".join(LOCALES),
+                        help="comma-separated TMDB locales to generate posters for, e.g. en-US,fr-FR")
+    parser.add_argument("--max-posters", type=int, default=MAX_POSTERS,
+                        help="stop starting new titles once this many posters are made")
+    parser.add_argument("--deadline", type=_parse_deadline, default=DEADLINE_SECONDS,
+                        help="stop starting new titles after this many seconds, or at a local time like 05:30")
+    parser.add_argument("--refresh", action="store_true",
+                        help="only re-render titles TMDB reports as changed since the last run")
+    parser.add_argument("--keep-output", action="store_true", default=KEEP_OUTPUT,
+                        help="keep posters from earlier runs instead of clearing the output folder")
+    args = parser.parse_args()
+    
+    locales = [locale.strip() for locale in args.locales.split(",") if locale.strip()]
+    generator = TMDBPosterGenerator(backend=args.backend, locales=locales, max_posters=args.max_posters,
+                                    deadline=args.deadline, keep_output=args.keep_output)
+    if args.plan:
+        entry = generator.plan
+    elif args.command == "fetch":
+        entry = functools.partial(generator.fetch, Path(args.snapshot))
+    elif args.command == "render":
+        entry = functools.partial(generator.render, Path(args.snapshot), args.workers, args.profile)
+    else:
+        entry = generator.refresh if args.refresh else generator.run
+    if args.profile:
+        with RunProfiler(Path(PROFILE_DIR)):
+            await entry()
+    else:
+        await entry()
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file